@@ -1,10 +1,26 @@
 import streamlit as st
-import requests
-import pandas as pd
-import pytz
-from datetime import datetime, timedelta
+import espn_client
+import game_store
+import live_stream
+import metrics
+from models import build_game
+from cards import render_game_card_html, render_period_detail_html
+from player_names import load_compiled_translations, lookup_player_name
+from box_score import format_box_score, parse_player_stats
+from summary_fetch import (FETCH_CONCURRENCY, SUMMARY_BATCH_DEADLINE, SUMMARY_REQUEST_DEADLINE,
+                           download_summary, gather_in_executor, is_final_summary)
+from polling import (POLL_INTERVAL, card_interval_outdated, card_refresh_interval, game_phase,
+                     next_poll_delay)
+from datetime import datetime, timedelta, timezone
+from time_utils import BEIJING_TZ, beijing_date_of, espn_date_keys
+import os
 import time
+import threading
 import concurrent.futures
+import pickle
+from collections import OrderedDict
+
+rerun_started = time.perf_counter()
 
 # 移动端优化配置
 st.set_page_config(
@@ -132,6 +148,23 @@ st.markdown("""
         transform: translateY(-2px);
     }
     
+    /* 比赛卡片布局 */
+    .card-row {
+        display: flex;
+        align-items: center;
+        gap: 8px;
+    }
+    
+    .card-team {
+        flex: 2;
+        min-width: 0;
+    }
+    
+    .card-center {
+        flex: 1;
+        text-align: center;
+    }
+    
     /* 时钟样式 */
     .game-clock {
         font-size: 18px;
@@ -283,9 +316,6 @@ if 'untranslated_players' not in st.session_state:
 if 'expanded_games' not in st.session_state:
     st.session_state.expanded_games = {}
 
-if 'game_period_info' not in st.session_state:
-    st.session_state.game_period_info = {}
-
 if 'game_collapsed' not in st.session_state:
     st.session_state.game_collapsed = {}
 
@@ -305,27 +335,18 @@ if 'last_refresh' not in st.session_state:
 if 'refresh_count' not in st.session_state:
     st.session_state.refresh_count = 0
 
-# 添加强制刷新标志
-if 'force_refresh' not in st.session_state:
-    st.session_state.force_refresh = False
-
-# 添加是否正在刷新的标志
-if 'is_refreshing' not in st.session_state:
-    st.session_state.is_refreshing = False
-
-beijing_tz = pytz.timezone('Asia/Shanghai')
+beijing_tz = BEIJING_TZ
 now_beijing = datetime.now(beijing_tz)
 
 # ====== 翻译数据加载 ======
 @st.cache_resource(ttl=600)
 def get_translations():
     try:
-        from translations import TEAM_TRANSLATION, PLAYER_TRANSLATION
-        return TEAM_TRANSLATION, PLAYER_TRANSLATION
+        return load_compiled_translations()
     except ImportError:
         return {}, {}
 
-_team_translation, _player_translation = get_translations()
+_team_translation, _player_index = get_translations()
 
 def translate_team_name(name):
     return _team_translation.get(name, name)
@@ -333,518 +354,688 @@ def translate_team_name(name):
 def translate_player_name(name):
     if not name:
         return name
+    translated = lookup_player_name(_player_index, name)
+    if translated is not None:
+        return translated
     name = name.strip()
-    if name in _player_translation:
-        return _player_translation[name]
-    
-    name_parts = name.split()
-    if len(name_parts) > 1:
-        suffixes = ['Jr.', 'Jr', 'Sr.', 'Sr', 'II', 'III', 'IV', 'V']
-        if name_parts[-1] in suffixes:
-            base_name = ' '.join(name_parts[:-1])
-            if base_name in _player_translation:
-                translated = _player_translation[base_name]
-                suffix_map = {'Jr.':'小','Jr':'小','Sr.':'老','Sr':'老','II':'二世','III':'三世','IV':'四世','V':'五世'}
-                return f"{translated}{suffix_map.get(name_parts[-1], '')}"
     
     if name and name not in ['DNP', 'N/A', '--', '', 'null', 'None']:
         st.session_state.untranslated_players.add(name)
     return name
 
+# ====== 缓存代际计数 ======
+@st.cache_resource
+def get_cache_generations():
+    """进程级缓存代际计数，刷新时只递增对应日期/比赛的代际，不清空全部缓存"""
+    return {'lock': threading.Lock(), 'schedule': {}, 'summary': {}}
+
+def get_cache_generation(kind, key):
+    return get_cache_generations()[kind].get(key, 0)
+
+def invalidate_cache_entries(date_str, event_ids=()):
+    """使指定北京日期涉及的 ESPN 赛程和指定比赛的球员数据缓存失效"""
+    generations = get_cache_generations()
+    with generations['lock']:
+        for espn_date in espn_date_keys(date_str):
+            generations['schedule'][espn_date] = generations['schedule'].get(espn_date, 0) + 1
+        for event_id in event_ids:
+            generations['summary'][event_id] = generations['summary'].get(event_id, 0) + 1
+
+# ====== 按比赛状态的缓存策略 ======
+LIVE_TTL = 2  # 有比赛进行中：短缓存
+PRE_TTL = 60  # 比赛未开始：约一分钟刷新一次
+# 已结束的比赛数据不会再变化：永不过期（ttl=None）
+
+@st.cache_resource
+def get_schedule_states():
+    """进程级记录每个 ESPN 日期最近一次赛程的整体状态，用于选择缓存策略"""
+    return {}
+
+def get_event_state(event):
+    return event.get('status', {}).get('type', {}).get('state', 'pre')
+
+def summarize_schedule_state(schedule):
+    """赛程整体状态：有进行中比赛为 'in'，全部结束为 'post'，否则为 'pre'"""
+    states = [get_event_state(event) for event in (schedule or {}).get('events', [])]
+    if 'in' in states:
+        return 'in'
+    if states and all(state == 'post' for state in states):
+        return 'post'
+    return 'pre'
+
 # ====== API 数据获取函数 ======
-@st.cache_data(ttl=2, show_spinner=False)  # 比分数据缓存2秒（非常短）
+def _download_scoreboard(espn_date):
+    params = {'dates': espn_date, 'lang': 'zh', 'region': 'cn'}
+    return espn_client.get_json('scoreboard', params=params, timeout=5)
+
+# 下载失败时抛出异常，st.cache_data 不会缓存失败结果
+@st.cache_data(ttl=LIVE_TTL, max_entries=64, show_spinner=False)
+def _fetch_scoreboard_live(espn_date, generation=0):
+    return _download_scoreboard(espn_date)
+
+@st.cache_data(ttl=PRE_TTL, max_entries=64, show_spinner=False)
+def _fetch_scoreboard_pre(espn_date, generation=0):
+    return _download_scoreboard(espn_date)
+
+@st.cache_data(ttl=None, max_entries=64, show_spinner=False)
+def _fetch_scoreboard_final(espn_date, generation=0):
+    return _download_scoreboard(espn_date)
+
+@st.cache_resource
+def get_warm_scoreboards():
+    """预热线程提前刷新的未开始日期赛程：ESPN 日期 -> (拉取时间, 缓存代际, 数据)"""
+    return {}
+
+def refresh_warm_scoreboard(espn_date):
+    """绕过 TTL 缓存重新拉取一个 ESPN 日期并写入预热表（只保留未开始的日期）"""
+    generation = get_cache_generation('schedule', espn_date)
+    scoreboard = _download_scoreboard(espn_date)
+    state = summarize_schedule_state(scoreboard)
+    get_schedule_states()[espn_date] = state
+    warm = get_warm_scoreboards()
+    if state == 'pre':
+        warm[espn_date] = (time.time(), generation, scoreboard)
+    else:
+        warm.pop(espn_date, None)
+
+def fetch_espn_scoreboard(espn_date):
+    """单个 ESPN 日期的赛程，按该日期上次的整体状态选择缓存时长；相邻两个北京日期共用同一份缓存。
+    未开始的日期优先读取预热表，预热线程在它过期前就已刷新"""
+    schedule_states = get_schedule_states()
+    generation = get_cache_generation('schedule', espn_date)
+    if schedule_states.get(espn_date) == 'pre':
+        warm = get_warm_scoreboards().get(espn_date)
+        if warm is not None and warm[1] == generation and time.time() - warm[0] < PRE_TTL:
+            return warm[2]
+    fetchers = {'in': _fetch_scoreboard_live, 'pre': _fetch_scoreboard_pre, 'post': _fetch_scoreboard_final}
+    scoreboard = fetchers[schedule_states.get(espn_date, 'in')](espn_date, generation)
+    schedule_states[espn_date] = summarize_schedule_state(scoreboard)
+    return scoreboard
+
+def merge_scoreboards(date_str, scoreboards):
+    """合并多个 ESPN 日期的赛程：按比赛ID去重，只保留北京时间当天开赛的比赛，按开赛时间排序"""
+    events = {}
+    for scoreboard in scoreboards:
+        for event in scoreboard.get('events', []):
+            event_id = event.get('id')
+            if event_id not in events and beijing_date_of(event.get('date')) == date_str:
+                events[event_id] = event
+    return {'events': sorted(events.values(), key=lambda event: event.get('date', ''))}
+
 def fetch_nba_schedule(date_str):
-    """获取NBA赛程数据"""
+    """获取北京时间某天的赛程：并发拉取重叠的两个 ESPN 日期后合并；
+    全部结束的日期直接从本地存储读取，全部结束后写入本地存储；失败返回 None"""
+    store = game_store.get_store()
+    if store is not None:
+        schedule = store.get_schedule(date_str)
+        if schedule is not None:
+            return schedule
     try:
-        eastern = pytz.timezone('America/New_York')
-        beijing_dt = beijing_tz.localize(datetime.strptime(date_str, '%Y-%m-%d'))
-        eastern_dt = beijing_dt.astimezone(eastern)
-        url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-        params = {'dates': eastern_dt.strftime('%Y%m%d'), 'lang': 'zh', 'region': 'cn'}
-        resp = requests.get(url, params=params, timeout=5)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
+        scoreboards = list(get_fetch_executor().map(fetch_espn_scoreboard, espn_date_keys(date_str)))
+    except Exception:
         return None
+    schedule = merge_scoreboards(date_str, scoreboards)
+    if store is not None and summarize_schedule_state(schedule) == 'post':
+        store.put_schedule(date_str, schedule)
+    return schedule
 
-def fetch_single_player_stats(event_id):
+def summary_memory_report(player_stats_map):
+    """每场比赛缓存的球员数据序列化后的字节数"""
+    return {event_id: len(pickle.dumps(data)) for event_id, data in player_stats_map.items()}
+
+@st.cache_data(ttl=LIVE_TTL, max_entries=256, show_spinner=False)
+def _fetch_summary_live(event_id, generation=0):
+    return download_summary(event_id)
+
+class SummaryNotFinal(Exception):
+    """赛程显示已结束但 summary 本身尚未结束（ESPN 终场时 summary 常滞后），不能永久缓存"""
+
+@st.cache_data(ttl=None, max_entries=512, show_spinner=False)
+def _fetch_summary_final(event_id, generation=0):
+    data = download_summary(event_id)
+    if not is_final_summary(data):
+        raise SummaryNotFinal(event_id)
+    return data
+
+def fetch_single_player_stats(event_id, state='in', generation=0):
+    """获取单场比赛球员数据：summary 本身已结束才永久缓存，否则短缓存"""
     try:
-        url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary"
-        resp = requests.get(url, params={'event': event_id}, timeout=3)
-        if resp.status_code == 200:
-            data = resp.json()
-            if data.get('boxscore') and data.get('boxscore').get('players'):
-                return event_id, data
+        if state == 'post':
+            try:
+                return event_id, _fetch_summary_final(event_id, generation)
+            except SummaryNotFinal:
+                pass
+        return event_id, _fetch_summary_live(event_id, generation)
     except Exception:
-        pass
-    return event_id, None
-
-@st.cache_data(ttl=2, show_spinner=False)  # 球员数据缓存2秒
-def fetch_all_player_stats_parallel(event_ids):
-    """并行获取所有球员数据"""
-    player_stats_map = {}
-    if event_ids:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(5, len(event_ids))) as executor:
-            future_to_id = {executor.submit(fetch_single_player_stats, eid): eid for eid in event_ids}
-            for future in concurrent.futures.as_completed(future_to_id):
-                event_id, data = future.result()
-                if data:
+        return event_id, None
+
+# ====== 异步并发获取引擎 ======
+@st.cache_resource
+def get_fetch_executor():
+    """进程级共享的 I/O 线程池，所有轮询器共用，限制对 ESPN 的总并发"""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY, thread_name_prefix='nba-fetch')
+
+def fetch_all_player_stats_parallel(event_states, batch_deadline=SUMMARY_BATCH_DEADLINE):
+    """并发获取所有球员数据，event_states 为 (比赛ID, 状态) 序列；超过截止时间返回部分结果"""
+    calls = [(eid, state, get_cache_generation('summary', eid)) for eid, state in event_states]
+    results = gather_in_executor(fetch_single_player_stats, calls, get_fetch_executor(),
+                                 SUMMARY_REQUEST_DEADLINE, batch_deadline)
+    return {event_id: data for event_id, data in results if data}
+
+# ====== 赛程快照增量比较 ======
+def event_fingerprint(event):
+    """提取一场比赛中会随比赛进行而变化的字段"""
+    competition = (event.get('competitions') or [{}])[0]
+    status = competition.get('status', {})
+    status_type = event.get('status', {}).get('type', {})
+    competitors = competition.get('competitors', [])
+    return {
+        'score': tuple(c.get('score') for c in competitors),
+        'period': status.get('period'),
+        'clock': status.get('displayClock'),
+        'linescores': tuple(tuple(ls.get('value') for ls in c.get('linescores', [])) for c in competitors),
+        'status': (status_type.get('state'), status_type.get('description'), event.get('date')),
+    }
+
+def diff_scoreboard(previous, events):
+    """比较相邻两次赛程快照，返回 (新指纹, {比赛ID: 变化字段元组}, 已移除的比赛ID)"""
+    fingerprints = {}
+    changes = {}
+    for event in events:
+        event_id = event.get('id')
+        fingerprint = event_fingerprint(event)
+        fingerprints[event_id] = fingerprint
+        old = previous.get(event_id)
+        if old is None:
+            changes[event_id] = tuple(fingerprint)
+        else:
+            changed = tuple(k for k in fingerprint if fingerprint[k] != old[k])
+            if changed:
+                changes[event_id] = changed
+    removed = set(previous) - set(fingerprints)
+    return fingerprints, changes, removed
+
+# ====== 共享后台轮询 ======
+POLLER_IDLE_TIMEOUT = 120  # 超过该时间无会话读取则停止轮询线程
+POLL_MIN_GAP = 1  # 手动唤醒时两次拉取的最小间隔（秒）
+SUMMARY_DEMAND_TTL = 60  # 展开的比赛在最后一次读取后继续后台刷新球员数据的时长（秒）
+PREFETCH_LIVE_SUMMARIES = True  # 是否在后台预取所有直播中比赛的球员数据
+
+class SchedulePoller:
+    """按日期在后台定时拉取赛程和球员数据，发布为所有会话共享的快照
+
+    球员数据只为被展开的比赛（以及可选的直播中比赛）拉取，赛程先行发布，
+    首屏只需等待赛程请求。
+    """
+
+    def __init__(self, date_str, interval=None):
+        self.date_str = date_str
+        self.interval = interval  # 为 None 时按比赛状态自适应
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._version = 0
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._last_read = time.time()
+        self._demand = {}  # 比赛ID -> 最近一次被展开读取的时间
+        self._fingerprints = {}  # 比赛ID -> 上一次赛程快照的指纹
+        self._games = {}  # 比赛ID -> Game，仅在变化时重建
+        self._revisions = {}  # 比赛ID -> 变化次数
+        self._changes = {}  # 本轮变化的比赛ID -> 变化字段
+        self._clock_moved = {}  # 比赛ID -> 比赛钟最近一次变化的时间
+        self._summary_generations = {}  # 比赛ID -> 上次拉取球员数据时的缓存代际
+        self._poll_ok = False
+        self._thread = threading.Thread(target=self._run, name=f"nba-poller-{date_str}", daemon=True)
+        self._thread.start()
+
+    def _publish(self, schedule, player_stats_map):
+        snapshot = {
+            'schedule': schedule,
+            'player_stats_map': player_stats_map,
+            'games': self._games,
+            'revisions': self._revisions,
+            'changes': self._changes,
+            'updated_at': time.time(),
+            'poll_error_at': None  # 最近一次拉取失败的时间，成功后清空
+        }
+        with self._lock:
+            self._version += 1
+            snapshot['version'] = self._version
+            self._snapshot = snapshot
+            self._updated.notify_all()
+        self._ready.set()
+
+    def _apply_diff(self, schedule):
+        """只为发生变化的比赛重建 Game 并递增版本号；games 按赛程顺序排列"""
+        fingerprints, changes, removed = diff_scoreboard(self._fingerprints, schedule.get('events', []))
+        games = {}
+        revisions = {eid: rev for eid, rev in self._revisions.items() if eid not in removed}
+        for event in schedule.get('events', []):
+            event_id = event.get('id')
+            if event_id in changes:
+                game = build_game(event)
+                revisions[event_id] = revisions.get(event_id, 0) + 1
+            else:
+                game = self._games.get(event_id)
+            if game is not None:
+                games[event_id] = game
+        now = time.time()
+        self._clock_moved = {eid: now if 'clock' in changes.get(eid, ()) else self._clock_moved.get(eid, now)
+                             for eid in games}
+        self._fingerprints = fingerprints
+        self._games = games
+        self._revisions = revisions
+        self._changes = changes
+
+    def _wanted_summaries(self, schedule):
+        """需要球员数据的比赛（比赛ID -> 状态）：近期被展开的，以及（可选）直播中的"""
+        now = time.time()
+        with self._lock:
+            demand = {eid: ts for eid, ts in self._demand.items() if now - ts < SUMMARY_DEMAND_TTL}
+            self._demand = demand
+        wanted = {}
+        for event in schedule.get('events', []):
+            state = get_event_state(event)
+            if state not in ['in', 'post']:
+                continue
+            if event['id'] in demand or (PREFETCH_LIVE_SUMMARIES and state == 'in'):
+                wanted[event['id']] = state
+        return wanted
+
+    def _poll_once(self):
+        with metrics.timed('scoreboard_fetch'):
+            schedule = fetch_nba_schedule(self.date_str)
+        self._poll_ok = schedule is not None
+        with self._lock:
+            if schedule is None and self._snapshot and self._snapshot['schedule']:
+                # 拉取失败时保留上次成功的快照，只记录失败时间（不递增版本号）
+                self._snapshot = dict(self._snapshot, poll_error_at=time.time())
+                return
+            previous = self._snapshot['player_stats_map'] if self._snapshot else {}
+        if schedule:
+            self._apply_diff(schedule)
+        # 先发布赛程，球员数据沿用上一轮结果
+        self._publish(schedule, previous)
+        if not schedule or not schedule.get('events'):
+            return
+        wanted = self._wanted_summaries(schedule)
+        generations = {eid: get_cache_generation('summary', eid) for eid in wanted}
+        # 已有最终数据、赛程未变化且未被手动刷新的比赛直接沿用；
+        # 球员数据尚未结束的（如中场休息、终场时 summary 滞后）每轮都重新拉取
+        player_stats_map = {eid: previous[eid] for eid in wanted if eid in previous}
+        stale = tuple((eid, state) for eid, state in wanted.items()
+                      if eid not in previous or eid in self._changes
+                      or not is_final_summary(previous[eid])
+                      or generations[eid] != self._summary_generations.get(eid))
+        if stale:
+            with metrics.timed('summary_fanout'):
+                fetched = fetch_all_player_stats_parallel(stale)
+            player_stats_map.update(fetched)
+            for eid in fetched:
+                self._summary_generations[eid] = generations[eid]
+        self._publish(schedule, player_stats_map)
+
+    def next_delay(self):
+        """距下次拉取的秒数：直播中按比赛阶段加快或放慢，全部未开始时等到临近开赛"""
+        if self.interval:
+            return self.interval
+        if not self._poll_ok:
+            return POLL_INTERVAL
+        now = time.time()
+        stalled = {eid: now - moved for eid, moved in self._clock_moved.items()}
+        return next_poll_delay(self._games.values(), datetime.now(timezone.utc), stalled)
+
+    def _sleep(self, delay):
+        """等待 delay 秒；被唤醒返回 True，无会话读取超时提前返回 False"""
+        deadline = time.time() + delay
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            if self._wake.wait(min(remaining, POLLER_IDLE_TIMEOUT)):
+                self._wake.clear()
+                return True
+            if time.time() - self._last_read >= POLLER_IDLE_TIMEOUT:
+                return False
+
+    def _run(self):
+        while time.time() - self._last_read < POLLER_IDLE_TIMEOUT:
+            try:
+                self._poll_once()
+            except Exception:
+                self._poll_ok = False
+                with self._lock:
+                    if self._snapshot:
+                        self._snapshot = dict(self._snapshot, poll_error_at=time.time())
+            if self._sleep(self.next_delay()):
+                time.sleep(POLL_MIN_GAP)
+
+    def event_ids(self):
+        """当前快照中的全部比赛ID"""
+        with self._lock:
+            schedule = self._snapshot['schedule'] if self._snapshot else None
+        if not schedule:
+            return []
+        return [event['id'] for event in schedule.get('events', []) if 'id' in event]
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def request_refresh(self):
+        """唤醒轮询线程立即拉取一次"""
+        self._wake.set()
+
+    def get_player_stats(self, event_id, state):
+        """按需读取单场比赛球员数据，并登记为需要后台持续刷新"""
+        with self._lock:
+            self._demand[event_id] = time.time()
+            player_stats_map = self._snapshot['player_stats_map'] if self._snapshot else {}
+        if event_id in player_stats_map:
+            return player_stats_map[event_id]
+        _, data = fetch_single_player_stats(event_id, state, get_cache_generation('summary', event_id))
+        if data:
+            with self._lock:
+                if self._snapshot:
+                    player_stats_map = dict(self._snapshot['player_stats_map'])
                     player_stats_map[event_id] = data
-    return player_stats_map
+                    self._snapshot = dict(self._snapshot, player_stats_map=player_stats_map)
+        return data
+
+    def get_snapshot(self, timeout=10):
+        """读取最新快照，首次读取时最多等待 timeout 秒"""
+        self._last_read = time.time()
+        self._ready.wait(timeout)
+        with self._lock:
+            return self._snapshot
+
+    def wait_for_update(self, version, timeout):
+        """阻塞直到快照版本号不同于 version 或超时，返回最新快照（供推送服务使用）"""
+        self._last_read = time.time()
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._snapshot is not None and self._snapshot['version'] != version, timeout
+            )
+            return self._snapshot
+
+@st.cache_resource
+def get_poller_registry():
+    """进程级轮询器注册表，所有会话共享"""
+    return {'lock': threading.Lock(), 'pollers': {}}
+
+def get_schedule_poller(date_str):
+    """获取（必要时启动）指定日期的共享轮询器"""
+    registry = get_poller_registry()
+    with registry['lock']:
+        poller = registry['pollers'].get(date_str)
+        if poller is None or not poller.is_alive():
+            poller = SchedulePoller(date_str)
+            registry['pollers'][date_str] = poller
+    return poller
+
+# ====== 日期窗口预热 ======
+DATE_WINDOW_DAYS = 3  # 日期选择器可选今天前后各几天
+# 预热间隔（秒）。st.cache_data 命中不会延长 TTL，所以未开始的日期不靠缓存命中保温，
+# 而是每轮绕过缓存重新拉取写入预热表；间隔小于 PRE_TTL，预热表中的数据在过期前就被替换
+WARM_INTERVAL = PRE_TTL // 2
+WARM_DATE_WINDOW = os.environ.get('NBA_WARM_CACHE', '1') != '0'  # 设为 0 关闭
+
+def warm_date_window():
+    """拉取日期窗口内每天的赛程和已结束比赛的球员数据，切换日期时直接命中缓存。
+    已全部结束的日期命中永久缓存或本地存储，不再产生上游请求"""
+    today = datetime.now(beijing_tz).date()
+    date_strs = [(today + timedelta(days=offset)).strftime('%Y-%m-%d')
+                 for offset in range(-DATE_WINDOW_DAYS, DATE_WINDOW_DAYS + 1)]
+    schedule_states = get_schedule_states()
+    espn_dates = dict.fromkeys(espn_date for date_str in date_strs for espn_date in espn_date_keys(date_str))
+    for espn_date in espn_dates:
+        if schedule_states.get(espn_date) == 'pre':
+            try:
+                refresh_warm_scoreboard(espn_date)
+            except Exception:
+                continue
+    for date_str in date_strs:
+        schedule = fetch_nba_schedule(date_str)
+        if not schedule:
+            continue
+        finished = tuple((event['id'], 'post') for event in schedule.get('events', [])
+                         if 'id' in event and get_event_state(event) == 'post')
+        if finished:
+            fetch_all_player_stats_parallel(finished)
+
+@st.cache_resource
+def start_cache_warmer():
+    """每个进程启动一个预热线程，启动时立即预热一次，之后定时预热"""
+    if not WARM_DATE_WINDOW:
+        return None
+
+    def run():
+        while True:
+            with metrics.timed('cache_warm'):
+                try:
+                    warm_date_window()
+                except Exception:
+                    pass
+            time.sleep(WARM_INTERVAL)
+
+    thread = threading.Thread(target=run, name='nba-cache-warmer', daemon=True)
+    thread.start()
+    return thread
+
+start_cache_warmer()
+
+# ====== 实时推送旁路服务 ======
+LIVE_STREAM_PORT = int(os.environ.get('NBA_STREAM_PORT', '8502'))  # 设为 0 关闭
+LIVE_STREAM_HOST = os.environ.get('NBA_STREAM_HOST', live_stream.DEFAULT_HOST)  # 对外提供时设为 0.0.0.0
+
+@st.cache_resource
+def start_live_stream():
+    """每个进程启动一次 SSE 推送服务，推送各场比赛的增量数据"""
+    if not LIVE_STREAM_PORT:
+        return None
+    try:
+        return live_stream.start_server(get_schedule_poller, host=LIVE_STREAM_HOST, port=LIVE_STREAM_PORT,
+                                        window_days=DATE_WINDOW_DAYS)
+    except OSError:
+        return None
+
+start_live_stream()
 
 # ====== 手动刷新函数 ======
-def manual_refresh_action():
-    """手动刷新时执行的操作"""
+def manual_refresh_action(date_str):
+    """手动刷新（按钮回调，在本次重跑渲染之前执行）：只让当前日期和可见比赛的缓存失效"""
     st.session_state.last_refresh = time.time()
     st.session_state.refresh_count += 1
-    st.session_state.force_refresh = True
     
-    # 清除所有缓存
-    st.cache_data.clear()
+    # 只失效当前日期和可见比赛的缓存，并唤醒共享轮询器立即拉取
+    poller = get_schedule_poller(date_str)
+    invalidate_cache_entries(date_str, poller.event_ids())
+    poller.request_refresh()
     
     # 清除分数缓存
     st.session_state.score_cache = {}
-    
-    # 标记正在刷新
-    st.session_state.is_refreshing = True
-
-# ====== 获取比赛节次信息 ======
-def get_game_period_info(event):
-    """从事件数据中提取节次信息"""
-    try:
-        competitions = event.get('competitions', [{}])
-        if not competitions:
-            return None
-            
-        competition = competitions[0]
-        status = competition.get('status', {})
-        status_type = status.get('type', {})
-        
-        # 获取节次和时钟
-        period = status.get('period', 0)
-        clock = status.get('displayClock', '')
-        
-        # 将时钟转换为秒数
-        clock_seconds = 0
-        if clock and clock != '0:00' and clock != '0':
-            if ':' in clock:
-                try:
-                    minutes, seconds = clock.split(':')
-                    clock_seconds = int(minutes) * 60 + int(seconds)
-                except:
-                    clock_seconds = 0
-            else:
-                try:
-                    clock_seconds = int(clock)
-                except:
-                    clock_seconds = 0
-        
-        # 处理比赛状态文本
-        state = status_type.get('state', 'pre')
-        description = status_type.get('description', '')
-        
-        # 获取比分
-        competitors = competition.get('competitors', [])
-        away_score = 0
-        home_score = 0
-        quarter_scores = []
-        
-        if len(competitors) >= 2:
-            # 修正：第一个是客场队伍，第二个是主场队伍
-            away_competitor = competitors[0]
-            home_competitor = competitors[1]
-            
-            # 获取总分
-            away_score = away_competitor.get('score', '0')
-            home_score = home_competitor.get('score', '0')
-            
-            # 获取每节得分
-            away_linescores = away_competitor.get('linescores', [])
-            home_linescores = home_competitor.get('linescores', [])
-            
-            # 格式化每节得分
-            quarter_scores = []
-            for i in range(min(len(away_linescores), len(home_linescores))):
-                away_q_score = away_linescores[i].get('value', 0)
-                home_q_score = home_linescores[i].get('value', 0)
-                
-                # 处理加时赛显示
-                quarter_num = i + 1
-                if quarter_num <= 4:
-                    quarter_label = f"第{quarter_num}节"
-                else:
-                    quarter_label = f"加时{quarter_num-4}"
-                
-                quarter_scores.append({
-                    'quarter': quarter_label,
-                    'away_score': away_q_score,
-                    'home_score': home_q_score,
-                    'quarter_num': quarter_num
-                })
-        
-        # 生成状态文本
-        if state == 'in':
-            if period <= 4:
-                period_text = f"第{period}节"
-            else:
-                period_text = f"加时{period-4}"
-        elif state == 'post':
-            period_text = "比赛结束"
-        else:
-            period_text = "未开始"
-        
-        return {
-            'period': period,
-            'clock': clock,
-            'clock_seconds': clock_seconds,
-            'period_text': period_text,
-            'quarter_scores': quarter_scores,
-            'state': state,
-            'description': description,
-            'away_score': away_score,
-            'home_score': home_score
-        }
-    except Exception as e:
-        return None
 
 # ====== 检查分数变化 ======
-def check_score_changes(event_id, away_score, home_score):
-    """检查分数是否发生变化，用于动画效果"""
-    cache_key = f"{event_id}_scores"
+def check_score_changes(game, revision=None):
+    """检查分数是否发生变化，用于动画效果；快照版本号未变时直接跳过比较"""
+    cache_key = f"{game.id}_scores"
     old_scores = st.session_state.score_cache.get(cache_key, {'away': 0, 'home': 0})
+    if revision is not None and old_scores.get('revision') == revision:
+        return False
     
-    try:
-        away_int = int(away_score) if away_score else 0
-        home_int = int(home_score) if home_score else 0
-    except:
-        away_int = 0
-        home_int = 0
+    away_int = game.away.score_int
+    home_int = game.home.score_int
     
     changed = False
     if old_scores['away'] != away_int or old_scores['home'] != home_int:
         changed = True
     
     # 更新缓存
-    st.session_state.score_cache[cache_key] = {'away': away_int, 'home': home_int}
+    st.session_state.score_cache[cache_key] = {'away': away_int, 'home': home_int, 'revision': revision}
     
     return changed
 
-# ====== 显示函数 ======
-def format_time(t):
-    if not t or str(t).strip() in ('0', '0:00', '--', '', 'DNP', 'N/A'):
-        return '0:00'
-    s = str(t).strip()
-    if ':' in s:
-        return s
-    try:
-        minutes = int(float(s))
-        return f"{minutes}:00"
-    except:
-        return s
-
-def safe_int(value, default=0):
-    if not value:
-        return default
-    try:
-        if '/' in str(value):
-            return int(str(value).split('/')[0])
-        return int(float(str(value)))
-    except:
-        return default
+# ====== 解析结果缓存 ======
+PARSED_CACHE_SIZE = 128  # 最多缓存的解析结果数
 
-def parse_player_stats(game_data):
-    try:
-        if not game_data or 'boxscore' not in game_data:
-            return [], []
-        players_section = game_data.get('boxscore', {}).get('players', [])
-        if not players_section or len(players_section) < 2:
-            return [], []
-        away_players, home_players = players_section[1], players_section[0]
-
-        def extract_team_data(team_data):
-            if not team_data:
-                return []
-            stats_list = team_data.get('statistics', [])
-            main_stat = None
-            for stat in stats_list:
-                if stat.get('athletes') and ('PTS' in stat.get('labels', []) or '得分' in stat.get('labels', [])):
-                    main_stat = stat
-                    break
-            if not main_stat:
-                return []
-            labels = main_stat.get('labels', [])
-            athletes = main_stat.get('athletes', [])
-            parsed = []
-            for ath in athletes:
-                try:
-                    athlete_data = ath.get('athlete', {})
-                    name_en = (athlete_data.get('displayName') or athlete_data.get('fullName') or 
-                               athlete_data.get('shortName') or ath.get('displayName') or ath.get('name') or '')
-                    name_en = str(name_en).strip()
-                    if not name_en or name_en in ['DNP', 'N/A', '--', 'null', 'None']:
-                        continue
-                    name_cn = translate_player_name(name_en)
-                    raw_vals = ath.get('stats', [])
-                    if not raw_vals:
-                        continue
-                    stat_map = {}
-                    for i, label in enumerate(labels):
-                        if i < len(raw_vals):
-                            val = raw_vals[i]
-                            stat_map[label] = str(val).strip() if val is not None else ''
-                    
-                    def get_stat(k, d='0'): return stat_map.get(k, d)
-                    def get_shot(k, d='0-0'): return get_stat(k, d).replace('/', '-')
-                    fg_part = get_shot('FG', '0-0').split('-')
-                    three_part = get_shot('3PT', '0-0').split('-')
-                    ft_part = get_shot('FT', '0-0').split('-')
-                    player_data = {
-                        '球员': name_cn,
-                        '时间': format_time(get_stat('MIN', '0')),
-                        '得分': get_stat('PTS', '0'),
-                        '投篮': f"{fg_part[0] if len(fg_part)>1 else '0'}/{fg_part[1] if len(fg_part)>1 else '0'}",
-                        '三分': f"{three_part[0] if len(three_part)>1 else '0'}/{three_part[1] if len(three_part)>1 else '0'}",
-                        '罚球': f"{ft_part[0] if len(ft_part)>1 else '0'}/{ft_part[1] if len(ft_part)>1 else '0'}",
-                        '篮板': get_stat('REB', '0'),
-                        '助攻': get_stat('AST', '0'),
-                        '失误': get_stat('TO', '0')
-                    }
-                    if (safe_int(player_data['得分']) > 0 or safe_int(player_data['篮板']) > 0 or 
-                        safe_int(player_data['助攻']) > 0 or player_data['时间'] not in ('0:00', '0')):
-                        parsed.append(player_data)
-                except Exception:
-                    continue
-            return parsed
-        away_data = extract_team_data(away_players)
-        home_data = extract_team_data(home_players)
-        return away_data, home_data
-    except Exception as e:
-        return [], []
-
-def display_simple_table(players_data, team_name):
-    if not players_data:
-        st.info("暂无球员数据")
-        return
-    players_data = sorted(players_data, key=lambda x: safe_int(x['得分'], 0), reverse=True)[:10]
-    simple_data = [{'球员': p['球员'], '时间': p['时间'], '得分': p['得分']} for p in players_data]
-    df = pd.DataFrame(simple_data)
-    if not df.empty:
-        st.markdown('<div style="overflow-x: auto;">', unsafe_allow_html=True)
-        st.dataframe(df, hide_index=True, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-def display_full_table(players_data):
-    if not players_data:
-        st.info("暂无球员数据")
-        return
-    df = pd.DataFrame(players_data)
-    if not df.empty:
-        df['得分'] = pd.to_numeric(df['得分'], errors='coerce')
-        df = df.sort_values('得分', ascending=False)
-        df['得分'] = df['得分'].astype(str)
-        st.markdown('<div style="overflow-x: auto;">', unsafe_allow_html=True)
-        st.dataframe(df, hide_index=True, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-# ====== 自动刷新检测 ======
-def check_auto_refresh():
-    """检查是否需要自动刷新"""
-    if st.session_state.auto_refresh:
-        current_time = time.time()
-        time_since_refresh = current_time - st.session_state.last_refresh
-        
-        if time_since_refresh > st.session_state.refresh_interval:
-            # 执行自动刷新
-            manual_refresh_action()
-            st.toast(f"🔄 自动刷新中...", icon="🔄")
-            return True
-    return False
+class ParsedViewCache:
+    """按 (类型, 比赛ID, 内容标记) 缓存解析结果的有界 LRU，数据未变化时跳过解析"""
 
-# ====== 主界面 ======
+    def __init__(self, max_entries=PARSED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
-# 顶部控制栏
-col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-with col1:
-    selected_date = st.date_input(
-        "选择日期",
-        value=now_beijing.date(),
-        min_value=now_beijing.date() - timedelta(days=3),
-        max_value=now_beijing.date() + timedelta(days=3),
-        label_visibility="collapsed"
-    )
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
 
-with col2:
-    # 自动刷新开关
-    auto_refresh = st.checkbox("自动刷新", value=st.session_state.auto_refresh, key='auto_refresh_checkbox')
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'entries': len(self._entries)
+            }
 
-with col3:
-    # 刷新间隔选择
-    refresh_interval = st.selectbox(
-        "刷新间隔",
-        options=[5, 10, 15, 30],
-        index=0,  # 默认5秒
-        key='refresh_interval_select',
-        label_visibility="collapsed"
-    )
+@st.cache_resource
+def get_parsed_view_cache():
+    """进程级解析结果缓存，所有会话共享"""
+    return ParsedViewCache()
 
-with col4:
-    manual_refresh = st.button("🔄 刷新数据", use_container_width=True, key='manual_refresh_top', type="primary")
-    if manual_refresh:
-        manual_refresh_action()
+def _timed_parse_player_stats(game_data):
+    with metrics.timed('parse_player_stats'):
+        return parse_player_stats(game_data)
 
-# 更新session状态
-st.session_state.auto_refresh = auto_refresh
-st.session_state.refresh_interval = refresh_interval
+def _load_or_parse_player_stats(event_id, game_data):
+    """已结束比赛的解析结果从本地存储读取，首次解析后写入"""
+    store = game_store.get_store()
+    if store is None or not is_final_summary(game_data):
+        return _timed_parse_player_stats(game_data)
+    box_score = store.get_box_score(event_id)
+    if box_score is None:
+        box_score = _timed_parse_player_stats(game_data)
+        store.put_box_score(event_id, box_score)
+    return box_score
 
-# 检查是否需要自动刷新（放在顶部，确保先执行）
-if check_auto_refresh():
-    st.rerun()
+def get_parsed_player_stats(event_id, game_data):
+    """同一份 summary 数据只解析一次；没有内容标记时直接解析"""
+    marker = game_data.get('_marker')
+    if marker is None:
+        return _timed_parse_player_stats(game_data)
+    return get_parsed_view_cache().get_or_compute(
+        ('players', event_id, marker), lambda: _load_or_parse_player_stats(event_id, game_data)
+    )
 
-# 显示自动刷新状态
-if auto_refresh:
-    last_refresh_time = datetime.fromtimestamp(st.session_state.last_refresh).strftime('%H:%M:%S')
-    current_time = time.time()
-    time_since_refresh = current_time - st.session_state.last_refresh
-    time_remaining = max(0, refresh_interval - time_since_refresh)
-    
-    info_cols = st.columns([4, 1])
-    with info_cols[0]:
-        st.markdown(f"""
-        <div class="auto-refresh-notice">
-            ⏱️ 自动刷新已开启 | 间隔: {refresh_interval}秒 | 上次刷新: {last_refresh_time} | 刷新次数: {st.session_state.refresh_count}
-        </div>
-        """, unsafe_allow_html=True)
-    with info_cols[1]:
-        if st.button("立即刷新", key='instant_refresh', use_container_width=True):
-            manual_refresh_action()
-            st.rerun()
+# ====== 性能指标采集 ======
+def collect_cache_metrics():
+    """解析缓存、ESPN 客户端和本地存储的即时指标"""
+    parsed = get_parsed_view_cache().stats()
+    pool = espn_client.pool_stats()
+    samples = [
+        ('nba_parsed_cache_hits_total', 'Parsed box-score cache hits.', 'counter', {}, parsed['hits']),
+        ('nba_parsed_cache_misses_total', 'Parsed box-score cache misses.', 'counter', {}, parsed['misses']),
+        ('nba_parsed_cache_hit_ratio', 'Parsed box-score cache hit ratio.', 'gauge', {}, parsed['hit_ratio']),
+        ('nba_upstream_requests_total', 'Requests sent to ESPN.', 'counter', {}, pool['requests']),
+        ('nba_upstream_errors_total', 'Failed ESPN requests.', 'counter', {}, pool['errors']),
+        ('nba_upstream_not_modified_total', 'ESPN 304 responses served from cache.', 'counter', {}, pool['not_modified']),
+        ('nba_upstream_pinned_hits_total', 'Finished-game payloads served without a request.', 'counter', {}, pool['pinned_hits']),
+        ('nba_upstream_connections_reused_total', 'Pooled ESPN connections reused.', 'counter', {}, pool['connections_reused']),
+    ]
+    store = game_store.get_store()
+    if store is not None:
+        stored = store.stats()
+        samples += [
+            ('nba_store_hits_total', 'Finished-game reads served from the local store.', 'counter', {}, stored['hits']),
+            ('nba_store_misses_total', 'Local store lookups that fell back to ESPN.', 'counter', {}, stored['misses']),
+            ('nba_store_writes_total', 'Finished games written to the local store.', 'counter', {}, stored['writes']),
+        ]
+    return samples
 
-st.subheader(f"📅 {selected_date.strftime('%Y年%m月%d日')}")
+metrics.register_collector('cache', collect_cache_metrics)
 
-# 加载主赛程数据
-with st.spinner("加载赛程数据..."):
-    schedule = fetch_nba_schedule(selected_date.strftime('%Y-%m-%d'))
+def display_metrics_panel():
+    """调试用：各阶段耗时和上游接口延迟"""
+    rows = []
+    for kind, family in (('阶段', metrics.STAGE_SECONDS), ('接口', metrics.UPSTREAM_SECONDS)):
+        for name, item in sorted(family.summary().items()):
+            rows.append({
+                '类型': kind, '名称': name, '次数': item['count'],
+                '平均(ms)': round(item['avg_ms'], 1), 'P95(ms)': round(item['p95_ms'], 1),
+                '最大(ms)': round(item['max_ms'], 1)
+            })
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        st.info("暂无性能数据")
 
-if not schedule or 'events' not in schedule:
-    st.error("无法获取数据，请稍后重试")
-    st.stop()
+# ====== 显示函数 ======
+def display_simple_table(players_df, team_name):
+    if players_df.empty:
+        st.info("暂无球员数据")
+        return
+    with metrics.timed('dataframe_build'):
+        df = format_box_score(players_df.sort_values('pts', ascending=False, kind='stable').head(10),
+                              translate_player_name, full=False)
+    st.markdown('<div style="overflow-x: auto;">', unsafe_allow_html=True)
+    st.dataframe(df, hide_index=True, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
 
-events = schedule['events']
-if not events:
-    st.info("今日无比赛")
-    st.stop()
+def display_full_table(players_df):
+    if players_df.empty:
+        st.info("暂无球员数据")
+        return
+    with metrics.timed('dataframe_build'):
+        df = format_box_score(players_df.sort_values('pts', ascending=False, kind='stable'), translate_player_name)
+    st.markdown('<div style="overflow-x: auto;">', unsafe_allow_html=True)
+    st.dataframe(df, hide_index=True, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
 
-# 并行加载球员数据
-live_or_post_event_ids = []
-for event in events:
-    status_type = event.get('status', {}).get('type', {})
-    if status_type.get('state', 'pre') in ['in', 'post']:
-        live_or_post_event_ids.append(event['id'])
-
-player_stats_map = {}
-if live_or_post_event_ids:
-    with st.spinner("加载球员数据..."):
-        player_stats_map = fetch_all_player_stats_parallel(live_or_post_event_ids)
-
-# 渲染比赛列表
-live_games_count = 0
-
-for i, event in enumerate(events):
-    comp = event.get('competitions', [{}])[0]
-    competitors = comp.get('competitors', [])
-    if len(competitors) < 2:
-        continue
-
-    # 修正：第一个是客场队伍，第二个是主场队伍
-    away, home = competitors[0], competitors[1]
-    away_name = translate_team_name(away.get('team', {}).get('displayName', '客队'))
-    home_name = translate_team_name(home.get('team', {}).get('displayName', '主队'))
-    
-    # 获取节次信息
-    period_info = get_game_period_info(event)
-    if period_info:
-        away_score = period_info['away_score']
-        home_score = period_info['home_score']
-        st.session_state.game_period_info[event['id']] = period_info
-    else:
-        away_score = away.get('score', '0')
-        home_score = home.get('score', '0')
+# ====== 比赛卡片（fragment 局部刷新） ======
+def toggle_game_collapsed(game_id):
+    """折叠/展开按钮回调：在 fragment 重跑前切换状态，无需再 rerun"""
+    st.session_state.game_collapsed[game_id] = not st.session_state.game_collapsed[game_id]
 
-    status_type = event.get('status', {}).get('type', {})
-    state = status_type.get('state', 'pre')
-    desc = status_type.get('description', '未开始')
+
+def render_game(date_str, game_id, phase, run_every=None):
+    """渲染单场比赛卡片；作为 fragment 按自己的间隔重跑，只读取共享快照，不重跑整个页面"""
+    poller = get_schedule_poller(date_str)
+    snapshot = poller.get_snapshot()
+    game = snapshot['games'].get(game_id) if snapshot else None
+    if (game is None or game_phase(game) != phase
+            or card_interval_outdated(game, run_every, datetime.now(timezone.utc))):
+        # 比赛阶段（开赛、节间、关键时刻、结束）或赛程变化，或临近开赛：整页重跑一次，
+        # 更新各卡片的刷新间隔和直播统计（fragment 自己重跑时沿用原来的间隔）
+        st.rerun(scope='app')
+    state = game.state
+
+    started = time.perf_counter()
+    away_name = translate_team_name(game.away.name or '客队')
+    home_name = translate_team_name(game.home.name or '主队')
     
     # 检查分数变化，用于动画
-    score_changed = check_score_changes(event['id'], away_score, home_score)
-    
-    if state == 'in':
-        status_badge, game_class = "🟢 直播中", "live-game"
-        live_games_count += 1
-    elif state == 'post':
-        status_badge, game_class = "⚫ 已结束", "finished-game"
-    else:
-        status_badge, game_class = "⏳ 未开始", "upcoming-game"
+    score_changed = check_score_changes(game, snapshot['revisions'].get(game_id))
 
-    try:
-        utc_time = datetime.fromisoformat(event['date'].replace('Z', '+00:00'))
-        bj_time = utc_time.astimezone(beijing_tz).strftime("%H:%M")
-    except:
-        bj_time = "时间待定"
+    bj_time = game.tip_off_beijing.strftime("%H:%M") if game.tip_off_beijing else "时间待定"
 
-    # 比赛卡片
-    game_id = event['id']
-    
-    # 为直播比赛添加分数变化动画类
-    score_animation_class = "score-change" if score_changed and state == 'in' else ""
-    
-    st.markdown(f'<div class="game-card {game_class} {score_animation_class}" id="game-{game_id}">', unsafe_allow_html=True)
-    
-    # 比赛基本信息 - 客场队伍在左，主场队伍在右
-    cols = st.columns([2, 1, 2])
-    with cols[0]:
-        try:
-            away_logo = away.get('team', {}).get('logo', '')
-            if away_logo:
-                st.markdown(f'<img src="{away_logo}" width="30" style="vertical-align: middle; margin-right: 5px;">', unsafe_allow_html=True)
-        except:
-            pass
-            
-        st.markdown(f'<div class="team-name">{away_name}</div>', unsafe_allow_html=True)
-        st.markdown(f'<span style="font-size: 24px; font-weight: bold;" class="score-display">{away_score}</span>', unsafe_allow_html=True)
-        
-    with cols[1]:
-        st.markdown("**VS**")
-        st.markdown(f'<div class="game-time">{bj_time}</div>', unsafe_allow_html=True)
-        
-        if state == 'in':
-            st.markdown(f'<span class="live-indicator">LIVE</span>', unsafe_allow_html=True)
-            
-    with cols[2]:
-        try:
-            home_logo = home.get('team', {}).get('logo', '')
-            if home_logo:
-                st.markdown(f'<img src="{home_logo}" width="30" style="vertical-align: middle; margin-right: 5px;">', unsafe_allow_html=True)
-        except:
-            pass
-            
-        st.markdown(f'<div class="team-name">{home_name}</div>', unsafe_allow_html=True)
-        st.markdown(f'<span style="font-size: 24px; font-weight: bold;" class="score-display">{home_score}</span>', unsafe_allow_html=True)
-    
-    # 显示状态信息和时钟
-    if state == 'in' and period_info and period_info['clock']:
-        clock_display = period_info['clock']
-        if clock_display and clock_display != '0:00':
-            st.markdown(f'<div class="game-clock">⏱️ {clock_display}</div>', unsafe_allow_html=True)
-    
-    # 显示状态标签
-    if state == 'in':
-        status_label = f"<span class='status-badge status-live'>{desc}</span>"
-    elif state == 'post':
-        status_label = f"<span class='status-badge status-final'>{desc}</span>"
-    else:
-        status_label = f"<span class='status-badge status-upcoming'>{desc}</span>"
-    
-    st.markdown(f"**{status_badge}** {status_label}", unsafe_allow_html=True)
+    # 比赛卡片（整张卡片合并为一段 HTML 输出）
+    st.markdown(render_game_card_html(game, away_name, home_name, bj_time, score_changed and state == 'in'),
+                unsafe_allow_html=True)
     
     # 初始化折叠状态
     if game_id not in st.session_state.game_collapsed:
@@ -852,74 +1043,23 @@ for i, event in enumerate(events):
     
     # 折叠/展开按钮
     toggle_label = "📖 展开详情" if st.session_state.game_collapsed[game_id] else "📕 折叠详情"
-    if st.button(toggle_label, key=f"toggle_{game_id}_{st.session_state.refresh_count}", use_container_width=True):
-        st.session_state.game_collapsed[game_id] = not st.session_state.game_collapsed[game_id]
-        st.rerun()
+    st.button(toggle_label, key=f"toggle_{game_id}_{st.session_state.refresh_count}", use_container_width=True,
+              on_click=toggle_game_collapsed, args=(game_id,))
     
     # 如果展开，显示详细信息
     if not st.session_state.game_collapsed[game_id]:
         # 显示节次信息
-        if state in ['in', 'post'] and period_info:
-            if period_info['state'] == 'in':
-                # 直播中：显示节次和倒计时
-                clock_display = ""
-                if period_info['clock'] and period_info['clock'] != '0:00':
-                    clock_display = f"⏱️ {period_info['clock']}"
-                    
-                period_display = f"**🎯 {period_info['period_text']} {clock_display}**"
-                st.markdown(period_display)
-                
-                # 显示每节得分
-                if period_info['quarter_scores']:
-                    st.markdown("**每节比分:**")
-                    
-                    quarter_scores = period_info['quarter_scores']
-                    num_quarters = len(quarter_scores)
-                    num_cols = min(4, num_quarters)
-                    
-                    if num_cols > 0:
-                        quarter_cols = st.columns(num_cols)
-                        
-                        for idx, q in enumerate(quarter_scores[:4]):
-                            col_idx = idx % num_cols
-                            with quarter_cols[col_idx]:
-                                current_class = "current" if q['quarter_num'] == period_info['period'] else ""
-                                st.markdown(f'<div class="quarter-box {current_class}"><strong>{q["quarter"]}</strong><br>{q["away_score"]}-{q["home_score"]}</div>', unsafe_allow_html=True)
-                    
-                    st.markdown(f"**当前总分: {away_name} {away_score}-{home_score} {home_name}**")
-            
-            elif period_info['state'] == 'post':
-                # 已结束：显示最终节次信息
-                st.markdown(f"**🏁 {period_info['period_text']}**")
-                
-                # 显示所有节次得分
-                if period_info['quarter_scores']:
-                    st.markdown("**全场比分:**")
-                    
-                    quarter_scores = period_info['quarter_scores']
-                    num_quarters = len(quarter_scores)
-                    
-                    for row_start in range(0, num_quarters, 4):
-                        row_end = min(row_start + 4, num_quarters)
-                        if row_start < row_end:
-                            row_cols = st.columns(min(4, row_end - row_start))
-                            
-                            for idx in range(row_start, row_end):
-                                q = quarter_scores[idx]
-                                col_idx = idx - row_start
-                                with row_cols[col_idx]:
-                                    st.markdown(f"**{q['quarter']}**")
-                                    st.markdown(f"**{q['away_score']}-{q['home_score']}**")
-                    
-                    st.markdown(f"**总比分: {away_name} {away_score}-{home_score} {home_name}**")
+        if state in ['in', 'post']:
+            st.markdown(render_period_detail_html(game, away_name, home_name), unsafe_allow_html=True)
         
         # 球员数据
         if state in ['in', 'post']:
-            game_data = player_stats_map.get(event['id'])
+            with st.spinner("加载球员数据..."):
+                game_data = poller.get_player_stats(game_id, state)
             if game_data:
-                away_p, home_p = parse_player_stats(game_data)
-                if away_p or home_p:
-                    game_key = f"game_{event['id']}"
+                away_p, home_p = get_parsed_player_stats(game_id, game_data)
+                if not away_p.empty or not home_p.empty:
+                    game_key = f"game_{game_id}"
                     if game_key not in st.session_state.expanded_games:
                         st.session_state.expanded_games[game_key] = {'away_expanded': False, 'home_expanded': False}
                     
@@ -928,12 +1068,12 @@ for i, event in enumerate(events):
                     tab1, tab2 = st.tabs([f"👤 {away_name}", f"👤 {home_name}"])
                     
                     with tab1:
-                        if away_p:
+                        if not away_p.empty:
                             st.markdown(f"**{away_name}**")
                             display_simple_table(away_p, away_name)
                             col_btn1, _ = st.columns([1, 1])
                             with col_btn1:
-                                if st.button("📊 详细数据", key=f"expand_away_{event['id']}_{st.session_state.refresh_count}", 
+                                if st.button("📊 详细数据", key=f"expand_away_{game_id}_{st.session_state.refresh_count}", 
                                           use_container_width=True, 
                                           type="secondary" if not st.session_state.expanded_games[game_key]['away_expanded'] else "primary"):
                                     st.session_state.expanded_games[game_key]['away_expanded'] = not st.session_state.expanded_games[game_key]['away_expanded']
@@ -944,12 +1084,12 @@ for i, event in enumerate(events):
                             st.info("暂无球员数据")
                     
                     with tab2:
-                        if home_p:
+                        if not home_p.empty:
                             st.markdown(f"**{home_name}**")
                             display_simple_table(home_p, home_name)
                             col_btn1, _ = st.columns([1, 1])
                             with col_btn1:
-                                if st.button("📊 详细数据", key=f"expand_home_{event['id']}_{st.session_state.refresh_count}", 
+                                if st.button("📊 详细数据", key=f"expand_home_{game_id}_{st.session_state.refresh_count}", 
                                           use_container_width=True, 
                                           type="secondary" if not st.session_state.expanded_games[game_key]['home_expanded'] else "primary"):
                                     st.session_state.expanded_games[game_key]['home_expanded'] = not st.session_state.expanded_games[game_key]['home_expanded']
@@ -958,12 +1098,93 @@ for i, event in enumerate(events):
                                 display_full_table(home_p)
                         else:
                             st.info("暂无球员数据")
+
+    metrics.observe_stage('render_card', time.perf_counter() - started)
+
+# ====== 主界面 ======
+
+# 顶部控制栏
+col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+with col1:
+    selected_date = st.date_input(
+        "选择日期",
+        value=now_beijing.date(),
+        min_value=now_beijing.date() - timedelta(days=DATE_WINDOW_DAYS),
+        max_value=now_beijing.date() + timedelta(days=DATE_WINDOW_DAYS),
+        label_visibility="collapsed"
+    )
+    selected_date_str = selected_date.strftime('%Y-%m-%d')
+
+with col2:
+    # 自动刷新开关
+    auto_refresh = st.checkbox("自动刷新", value=st.session_state.auto_refresh, key='auto_refresh_checkbox')
+
+with col3:
+    # 刷新间隔选择
+    refresh_interval = st.selectbox(
+        "刷新间隔",
+        options=[5, 10, 15, 30],
+        index=0,  # 默认5秒
+        key='refresh_interval_select',
+        label_visibility="collapsed"
+    )
+
+with col4:
+    st.button("🔄 刷新数据", use_container_width=True, key='manual_refresh_top', type="primary",
+              on_click=manual_refresh_action, args=(selected_date_str,))
+
+# 更新session状态
+st.session_state.auto_refresh = auto_refresh
+st.session_state.refresh_interval = refresh_interval
+
+# 显示自动刷新状态（直播中的比赛卡片各自按间隔刷新，页面其余部分不重跑）
+if auto_refresh:
+    last_refresh_time = datetime.fromtimestamp(st.session_state.last_refresh).strftime('%H:%M:%S')
     
-    st.markdown('</div>', unsafe_allow_html=True)
+    info_cols = st.columns([4, 1])
+    with info_cols[0]:
+        st.markdown(f"""
+        <div class="auto-refresh-notice">
+            ⏱️ 自动刷新已开启 | 直播比赛间隔: {refresh_interval}秒 | 上次手动刷新: {last_refresh_time} | 刷新次数: {st.session_state.refresh_count}
+        </div>
+        """, unsafe_allow_html=True)
+    with info_cols[1]:
+        st.button("立即刷新", key='instant_refresh', use_container_width=True,
+                  on_click=manual_refresh_action, args=(selected_date_str,))
+
+st.subheader(f"📅 {selected_date.strftime('%Y年%m月%d日')}")
+
+# 加载主赛程数据（读取后台轮询器发布的共享快照）
+with st.spinner("加载赛程数据..."):
+    schedule_poller = get_schedule_poller(selected_date_str)
+    with metrics.timed('snapshot_wait'):
+        snapshot = schedule_poller.get_snapshot()
+
+schedule = snapshot['schedule'] if snapshot else None
+if not schedule or 'events' not in schedule:
+    st.error("无法获取数据，请稍后重试")
+    st.stop()
+if snapshot['poll_error_at']:
+    st.caption("⚠️ 暂时无法更新数据，当前显示的是上次成功获取的结果")
+
+events = schedule['events']
+if not events:
+    st.info("今日无比赛")
+    st.stop()
+
+# 渲染比赛列表：每场比赛是独立的 fragment，按比赛阶段各自重跑，已结束的不再执行
+render_started = time.perf_counter()
+games = list(snapshot['games'].values())
+live_games_count = sum(1 for game in games if game.state == 'in')
+for i, game in enumerate(games):
+    run_every = card_refresh_interval(game, auto_refresh, refresh_interval, datetime.now(timezone.utc))
+    st.fragment(render_game, run_every=run_every)(selected_date_str, game.id, game_phase(game), run_every)
     
-    if i < len(events) - 1:
+    if i < len(games) - 1:
         st.divider()
 
+metrics.observe_stage('render_cards', time.perf_counter() - render_started)
+
 # 显示直播比赛统计
 if live_games_count > 0:
     st.markdown(f"""
@@ -976,14 +1197,12 @@ if live_games_count > 0:
 st.markdown("---")
 col1, col2, col3 = st.columns([1, 1, 1])
 with col1:
-    if st.button("🔄 刷新所有数据", use_container_width=True, type="primary", key='manual_refresh_bottom'):
-        manual_refresh_action()
-        st.rerun()
+    st.button("🔄 刷新所有数据", use_container_width=True, type="primary", key='manual_refresh_bottom',
+              on_click=manual_refresh_action, args=(selected_date_str,))
         
 with col2:
-    if st.button("📊 刷新球员数据", use_container_width=True, key='refresh_players'):
-        manual_refresh_action()
-        st.rerun()
+    st.button("📊 刷新球员数据", use_container_width=True, key='refresh_players',
+              on_click=manual_refresh_action, args=(selected_date_str,))
 
 with col3:
     if st.button("⬆️ 返回顶部", use_container_width=True, key='back_to_top'):
@@ -998,22 +1217,6 @@ with footer_cols[1]:
     if st.button("⚙️ 设置", use_container_width=True, key='settings'):
         st.session_state.show_settings = not st.session_state.get('show_settings', False)
 
-# ====== 自动刷新进度条显示 ======
-if st.session_state.auto_refresh:
-    current_time = time.time()
-    time_since_refresh = current_time - st.session_state.last_refresh
-    
-    # 显示倒计时
-    time_remaining = max(0, st.session_state.refresh_interval - time_since_refresh)
-    
-    # 创建倒计时进度条
-    progress = min(1.0, max(0.0, time_since_refresh / st.session_state.refresh_interval))
-    
-    if 0.0 <= progress <= 1.0:
-        st.progress(progress, text=f"⏱️ 下次刷新: {int(time_remaining)}秒")
-    else:
-        st.markdown(f'<div class="refresh-countdown">⏱️ 下次刷新: {int(time_remaining)}秒</div>', unsafe_allow_html=True)
-
 # 显示设置面板（如果打开）
 if st.session_state.get('show_settings', False):
     st.markdown("---")
@@ -1028,6 +1231,19 @@ if st.session_state.get('show_settings', False):
         show_animations = st.checkbox("显示动画效果", value=True, key='show_animations')
         highlight_live_games = st.checkbox("高亮显示直播比赛", value=True, key='highlight_live_games')
     
+    parsed_stats = get_parsed_view_cache().stats()
+    st.caption(f"解析缓存: 命中 {parsed_stats['hits']} | 未命中 {parsed_stats['misses']} | 命中率 {parsed_stats['hit_ratio']:.0%} | 条目 {parsed_stats['entries']}")
+    store = game_store.get_store()
+    if store is not None:
+        stored = store.stats()
+        st.caption(f"本地存储: 赛程 {stored.get('schedules', 0)} 天 | 比赛 {stored.get('summaries', 0)} 场 | 命中 {stored['hits']} | {stored['path']}")
+    if st.checkbox("显示性能面板", value=False, key='show_metrics_panel'):
+        display_metrics_panel()
+    memory_report = summary_memory_report(snapshot['player_stats_map'])
+    if memory_report:
+        per_game = ' | '.join(f"{eid}: {size / 1024:.1f}KB" for eid, size in memory_report.items())
+        st.caption(f"球员数据缓存: 共 {sum(memory_report.values()) / 1024:.1f}KB（{per_game}）")
+    
     if st.button("保存设置", type="primary"):
         st.session_state.auto_refresh = auto_refresh
         st.session_state.refresh_interval = refresh_interval
@@ -1038,8 +1254,4 @@ if st.session_state.get('show_settings', False):
         st.session_state.show_settings = False
         st.rerun()
 
-# 最后，如果有强制刷新标志，执行rerun
-if st.session_state.get('force_refresh', False):
-    st.session_state.force_refresh = False
-    st.session_state.is_refreshing = False
-    st.rerun()
+metrics.observe_stage('rerun_total', time.perf_counter() - rerun_started)
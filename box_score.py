@@ -0,0 +1,129 @@
+"""球员数据解析（列式）：把 ESPN summary 的 labels/stats 数组直接转成整数列的 DataFrame
+
+name 保存 ESPN 英文名，显示时再翻译，解析结果和本地存储不受翻译表更新影响。
+pandas 只在解析或显示球员数据时才导入，首屏不承担导入耗时。
+"""
+BOX_SCORE_COLUMNS = ['name', 'min_seconds', 'pts', 'fgm', 'fga', 'tpm', 'tpa', 'ftm', 'fta', 'reb', 'ast', 'to']
+
+
+def _stat_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _made_attempted(value):
+    """'5-10' 或 '5/10' -> (5, 10)"""
+    parts = str(value or '').replace('/', '-').split('-')
+    if len(parts) != 2:
+        return 0, 0
+    return _stat_int(parts[0]), _stat_int(parts[1])
+
+
+def _minutes_to_seconds(value):
+    s = str(value or '').strip()
+    try:
+        if ':' in s:
+            minutes, seconds = s.split(':')
+            return int(minutes) * 60 + int(seconds)
+        return int(float(s)) * 60
+    except ValueError:
+        return 0
+
+
+def empty_box_score():
+    import pandas as pd
+    return pd.DataFrame({col: pd.Series(dtype='object' if col == 'name' else 'int64') for col in BOX_SCORE_COLUMNS})
+
+
+def _extract_team_columns(team_data):
+    """把 ESPN 的 labels/stats 数组直接转成按列存放的整数数组"""
+    import pandas as pd
+    if not team_data:
+        return empty_box_score()
+    main_stat = None
+    for stat in team_data.get('statistics', []):
+        if stat.get('athletes') and ('PTS' in stat.get('labels', []) or '得分' in stat.get('labels', [])):
+            main_stat = stat
+            break
+    if not main_stat:
+        return empty_box_score()
+    positions = {label: i for i, label in enumerate(main_stat.get('labels', []))}
+    columns = {col: [] for col in BOX_SCORE_COLUMNS}
+    for ath in main_stat.get('athletes', []):
+        athlete_data = ath.get('athlete', {})
+        name_en = (athlete_data.get('displayName') or athlete_data.get('fullName') or
+                   athlete_data.get('shortName') or ath.get('displayName') or ath.get('name') or '')
+        name_en = str(name_en).strip()
+        if not name_en or name_en in ['DNP', 'N/A', '--', 'null', 'None']:
+            continue
+        raw_vals = ath.get('stats', [])
+        if not raw_vals:
+            continue
+
+        def raw(label):
+            i = positions.get(label)
+            return raw_vals[i] if i is not None and i < len(raw_vals) else None
+
+        min_seconds, pts = _minutes_to_seconds(raw('MIN')), _stat_int(raw('PTS'))
+        reb, ast = _stat_int(raw('REB')), _stat_int(raw('AST'))
+        # 只保留上场的球员
+        if not (pts > 0 or reb > 0 or ast > 0 or min_seconds > 0):
+            continue
+        fgm, fga = _made_attempted(raw('FG'))
+        tpm, tpa = _made_attempted(raw('3PT'))
+        ftm, fta = _made_attempted(raw('FT'))
+        columns['name'].append(name_en)
+        columns['min_seconds'].append(min_seconds)
+        columns['pts'].append(pts)
+        columns['fgm'].append(fgm)
+        columns['fga'].append(fga)
+        columns['tpm'].append(tpm)
+        columns['tpa'].append(tpa)
+        columns['ftm'].append(ftm)
+        columns['fta'].append(fta)
+        columns['reb'].append(reb)
+        columns['ast'].append(ast)
+        columns['to'].append(_stat_int(raw('TO')))
+    if not columns['name']:
+        return empty_box_score()
+    # 各列已是整数列表，pandas 直接推断为 int64，不再逐列转换类型
+    return pd.DataFrame(columns)
+
+
+def parse_player_stats(game_data):
+    """解析 summary 数据，返回 (客队, 主队) 两个列式 DataFrame"""
+    try:
+        if not game_data or 'boxscore' not in game_data:
+            return empty_box_score(), empty_box_score()
+        players_section = game_data.get('boxscore', {}).get('players', [])
+        if not players_section or len(players_section) < 2:
+            return empty_box_score(), empty_box_score()
+        away_players, home_players = players_section[1], players_section[0]
+        return _extract_team_columns(away_players), _extract_team_columns(home_players)
+    except Exception:
+        return empty_box_score(), empty_box_score()
+
+
+def _made_attempted_text(made, attempted):
+    return [f"{m}/{a}" for m, a in zip(made.tolist(), attempted.tolist())]
+
+
+def format_box_score(df, translate_name, full=True):
+    """把列式数据格式化成表格显示用的列，translate_name 在此时把英文名翻译成中文。
+    每队只有十几行，逐行拼字符串比 pandas 的字符串列运算快得多，最后一次性构造 DataFrame"""
+    import pandas as pd
+    display = {
+        '球员': [translate_name(name) for name in df['name'].tolist()],
+        '时间': [f"{s // 60}:{s % 60:02d}" for s in df['min_seconds'].tolist()],
+        '得分': df['pts'].to_numpy(),
+    }
+    if full:
+        display['投篮'] = _made_attempted_text(df['fgm'], df['fga'])
+        display['三分'] = _made_attempted_text(df['tpm'], df['tpa'])
+        display['罚球'] = _made_attempted_text(df['ftm'], df['fta'])
+        display['篮板'] = df['reb'].to_numpy()
+        display['助攻'] = df['ast'].to_numpy()
+        display['失误'] = df['to'].to_numpy()
+    return pd.DataFrame(display)
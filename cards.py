@@ -0,0 +1,87 @@
+"""比赛卡片的 HTML 渲染：每张卡片只输出一段 HTML（一条 st.markdown 消息），
+只有按钮等交互控件仍是独立组件。模板预先编译，渲染结果按不可变的 Game 缓存，跨会话复用。
+"""
+import functools
+import html
+import string
+
+STATUS_STYLES = {
+    'in': ("🟢 直播中", "live-game", "status-live"),
+    'post': ("⚫ 已结束", "finished-game", "status-final"),
+    'pre': ("⏳ 未开始", "upcoming-game", "status-upcoming"),
+}
+
+# 模板不能有缩进和空行，否则会被 markdown 当成代码块
+CARD_TEMPLATE = string.Template(''.join([
+    '<div class="game-card $game_class $animation_class" id="game-$game_id">',
+    '<div class="card-row">',
+    '<div class="card-team">$away_logo<div class="team-name">$away_name</div>',
+    '<span style="font-size: 24px; font-weight: bold;" class="score-display">$away_score</span></div>',
+    '<div class="card-center"><strong>VS</strong><div class="game-time">$bj_time</div>$live_indicator</div>',
+    '<div class="card-team">$home_logo<div class="team-name">$home_name</div>',
+    '<span style="font-size: 24px; font-weight: bold;" class="score-display">$home_score</span></div>',
+    '</div>',
+    '$clock',
+    '<div><strong>$status_badge</strong> <span class="status-badge $status_class">$description</span></div>',
+    '</div>',
+]))
+LOGO_TEMPLATE = string.Template('<img src="$logo" width="30" style="vertical-align: middle; margin-right: 5px;">')
+QUARTER_BOX_TEMPLATE = string.Template(
+    '<div class="quarter-box $current_class"><strong>$label</strong><br>$away_score-$home_score</div>'
+)
+
+
+def _logo_html(logo):
+    return LOGO_TEMPLATE.substitute(logo=html.escape(logo)) if logo else ''
+
+
+@functools.lru_cache(maxsize=256)
+def render_game_card_html(game, away_name, home_name, bj_time, animate):
+    """比赛卡片主体（队徽、队名、比分、时间、状态）；Game 不可变，相同输入直接复用结果"""
+    status_badge, game_class, status_class = STATUS_STYLES.get(game.state, STATUS_STYLES['pre'])
+    clock = ''
+    if game.state == 'in' and game.clock and game.clock != '0:00':
+        clock = f'<div class="game-clock">⏱️ {html.escape(game.clock)}</div>'
+    return CARD_TEMPLATE.substitute(
+        game_class=game_class,
+        animation_class="score-change" if animate else "",
+        game_id=html.escape(game.id),
+        away_logo=_logo_html(game.away.logo),
+        away_name=html.escape(away_name),
+        away_score=html.escape(game.away.score),
+        bj_time=html.escape(bj_time),
+        live_indicator='<span class="live-indicator">LIVE</span>' if game.state == 'in' else '',
+        home_logo=_logo_html(game.home.logo),
+        home_name=html.escape(home_name),
+        home_score=html.escape(game.home.score),
+        clock=clock,
+        status_badge=status_badge,
+        status_class=status_class,
+        description=html.escape(game.description),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def render_period_detail_html(game, away_name, home_name):
+    """展开后的节次信息和每节比分"""
+    current_period = game.period if game.state == 'in' else None
+    boxes = ''.join(
+        QUARTER_BOX_TEMPLATE.substitute(
+            current_class="current" if q.quarter_num == current_period else "",
+            label=q.label, away_score=q.away_score, home_score=q.home_score
+        )
+        for q in game.quarter_scores
+    )
+    score_line = f"{html.escape(away_name)} {html.escape(game.away.score)}-{html.escape(game.home.score)} {html.escape(home_name)}"
+    if game.state == 'in':
+        clock = f"⏱️ {html.escape(game.clock)}" if game.clock and game.clock != '0:00' else ""
+        parts = [f"<p><strong>🎯 {game.period_text} {clock}</strong></p>"]
+        if boxes:
+            parts.append(f'<p><strong>每节比分:</strong></p><div class="quarter-container">{boxes}</div>')
+            parts.append(f"<p><strong>当前总分: {score_line}</strong></p>")
+    else:
+        parts = [f"<p><strong>🏁 {game.period_text}</strong></p>"]
+        if boxes:
+            parts.append(f'<p><strong>全场比分:</strong></p><div class="quarter-container">{boxes}</div>')
+            parts.append(f"<p><strong>总比分: {score_line}</strong></p>")
+    return ''.join(parts)
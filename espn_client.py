@@ -0,0 +1,247 @@
+"""ESPN 接口客户端：进程级共享的连接池会话（keep-alive、重试退避、连接池统计、条件请求）"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+ESPN_BASE_URL = os.environ.get(
+    'ESPN_BASE_URL', 'https://site.api.espn.com/apis/site/v2/sports/basketball/nba'
+)
+
+# 连接池与重试策略，可通过环境变量或 configure() 调整
+POOL_SIZE = int(os.environ.get('ESPN_POOL_SIZE', '16'))
+RETRY_TOTAL = int(os.environ.get('ESPN_RETRY_TOTAL', '2'))
+RETRY_BACKOFF = float(os.environ.get('ESPN_RETRY_BACKOFF', '0.3'))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 条件请求的校验缓存（ETag / Last-Modified + 已解析的数据）
+VALIDATOR_CACHE_SIZE = int(os.environ.get('ESPN_VALIDATOR_CACHE_SIZE', '512'))
+
+
+def _available_json_decoders():
+    """可用的 JSON 解码器：优先 orjson / msgspec（已安装时），否则使用标准库"""
+    decoders = {'json': json.loads}
+    try:
+        import msgspec
+        decoders['msgspec'] = msgspec.json.Decoder().decode
+    except ImportError:
+        pass
+    try:
+        import orjson
+        decoders['orjson'] = orjson.loads
+    except ImportError:
+        pass
+    return decoders
+
+
+JSON_DECODERS = _available_json_decoders()
+JSON_BACKEND = os.environ.get('ESPN_JSON_BACKEND') or next(
+    name for name in ('orjson', 'msgspec', 'json') if name in JSON_DECODERS
+)
+if JSON_BACKEND not in JSON_DECODERS:
+    JSON_BACKEND = 'json'
+
+
+def set_json_backend(name):
+    """切换 JSON 解码后端（'orjson' / 'msgspec' / 'json'）"""
+    global JSON_BACKEND
+    if name not in JSON_DECODERS:
+        raise ValueError(f"JSON 解码后端 {name} 不可用，可选: {', '.join(JSON_DECODERS)}")
+    JSON_BACKEND = name
+
+
+def decode_json(content):
+    """用当前后端解码响应字节"""
+    return JSON_DECODERS[JSON_BACKEND](content)
+
+
+_lock = threading.Lock()
+_session = None
+_no_retry_session = None
+_counters = {'requests': 0, 'errors': 0, 'not_modified': 0, 'pinned_hits': 0}
+_validators = OrderedDict()
+
+
+def _build_session(pool_size, retry_total, backoff_factor):
+    # requests 在首次请求时才导入（通常在后台轮询线程中），不占用页面启动时间
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retry_total,
+        connect=retry_total,
+        read=retry_total,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # 不重试的会话与上面共用同一个连接池，供有截止时间的调用方使用
+    no_retry_adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    no_retry_adapter.poolmanager = adapter.poolmanager
+    no_retry_session = requests.Session()
+    no_retry_session.mount('http://', no_retry_adapter)
+    no_retry_session.mount('https://', no_retry_adapter)
+    return session, no_retry_session
+
+
+def configure(pool_size=None, retry_total=None, backoff_factor=None):
+    """按新的连接池大小和重试策略重建共享会话"""
+    global _session, _no_retry_session, POOL_SIZE, RETRY_TOTAL, RETRY_BACKOFF
+    with _lock:
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if retry_total is not None:
+            RETRY_TOTAL = retry_total
+        if backoff_factor is not None:
+            RETRY_BACKOFF = backoff_factor
+        old_session = _session
+        _session, _no_retry_session = _build_session(POOL_SIZE, RETRY_TOTAL, RETRY_BACKOFF)
+        _counters.update(requests=0, errors=0, not_modified=0, pinned_hits=0)
+    if old_session is not None:
+        old_session.close()
+
+
+def get_session(retry=True):
+    """获取进程级共享会话（首次调用时创建）；retry 为 False 时返回共用连接池、不重试的会话"""
+    global _session, _no_retry_session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session, _no_retry_session = _build_session(POOL_SIZE, RETRY_TOTAL, RETRY_BACKOFF)
+                _session = session
+    return _session if retry else _no_retry_session
+
+
+def get(path, params=None, timeout=5, headers=None, retry=True):
+    """对 ESPN 接口发起 GET 请求，path 为相对 ESPN_BASE_URL 的路径（如 'scoreboard'）。
+    retry 为 False 时失败不重试，请求占用的时间不超过 timeout（供有截止时间的调用方使用）"""
+    import requests
+
+    url = f"{ESPN_BASE_URL}/{path}"
+    with _lock:
+        _counters['requests'] += 1
+    started = time.perf_counter()
+    try:
+        return get_session(retry).get(url, params=params, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        with _lock:
+            _counters['errors'] += 1
+        raise
+    finally:
+        metrics.observe_upstream(path, time.perf_counter() - started)
+
+
+def _cache_key(path, params):
+    return path, tuple(sorted((params or {}).items()))
+
+
+def get_json(path, params=None, timeout=5, pin_if=None, with_marker=False, transform=None, retry=True):
+    """带条件请求的 GET：304 时直接返回上次解析的对象而不重新解码 JSON。
+
+    pin_if(data) 返回 True 时该结果被永久固定，之后不再请求（用于已结束的比赛）。
+    with_marker 为 True 时返回 (data, marker)，marker 为 ETag / Last-Modified
+    或响应内容哈希，内容不变时 marker 不变。
+    transform(data) 在缓存前对解析结果做裁剪，缓存和返回的都是裁剪后的对象。
+    retry 同 get()。
+    非 200/304 响应抛出 requests.HTTPError。
+    """
+    key = _cache_key(path, params)
+    with _lock:
+        entry = _validators.get(key)
+        if entry is not None:
+            _validators.move_to_end(key)
+            if entry['pinned']:
+                _counters['pinned_hits'] += 1
+                return (entry['data'], entry['marker']) if with_marker else entry['data']
+
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    resp = get(path, params=params, timeout=timeout, headers=headers, retry=retry)
+    if resp.status_code == 304 and entry is not None:
+        with _lock:
+            _counters['not_modified'] += 1
+        data = entry['data']
+    else:
+        resp.raise_for_status()
+        data = decode_json(resp.content)
+        if transform is not None:
+            data = transform(data)
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'marker': etag or last_modified or hashlib.blake2b(resp.content, digest_size=16).hexdigest(),
+            'data': data,
+            'pinned': False,
+        }
+        if entry['etag'] or entry['last_modified'] or pin_if is not None:
+            with _lock:
+                _validators[key] = entry
+                _validators.move_to_end(key)
+                while len(_validators) > VALIDATOR_CACHE_SIZE:
+                    _validators.popitem(last=False)
+
+    if pin_if is not None and not entry['pinned'] and pin_if(data):
+        with _lock:
+            entry['pinned'] = True
+    return (data, entry['marker']) if with_marker else data
+
+
+def clear_validators():
+    """清空条件请求校验缓存（含已固定的结果），之后的请求都重新下载完整响应"""
+    with _lock:
+        _validators.clear()
+
+
+def pool_stats():
+    """连接池统计：请求数、新建连接数、复用次数及各主机连接池状态"""
+    session = get_session()
+    adapter = session.get_adapter(ESPN_BASE_URL)
+    pools = []
+    total_connections = 0
+    total_pool_requests = 0
+    manager = adapter.poolmanager
+    for key in list(manager.pools.keys()):
+        pool = manager.pools.get(key)
+        if pool is None:
+            continue
+        total_connections += pool.num_connections
+        total_pool_requests += pool.num_requests
+        pools.append({
+            'host': pool.host,
+            'port': pool.port,
+            'connections_created': pool.num_connections,
+            'requests': pool.num_requests,
+            'idle_connections': pool.pool.qsize() if pool.pool is not None else 0,
+        })
+    with _lock:
+        counters = dict(_counters)
+    return {
+        'pool_size': POOL_SIZE,
+        'json_backend': JSON_BACKEND,
+        'requests': counters['requests'],
+        'errors': counters['errors'],
+        'not_modified': counters['not_modified'],
+        'pinned_hits': counters['pinned_hits'],
+        'validators': len(_validators),
+        'connections_created': total_connections,
+        'connections_reused': max(0, total_pool_requests - total_connections),
+        'pools': pools,
+    }
@@ -0,0 +1,125 @@
+"""已结束比赛的本地持久化存储（SQLite）
+
+全部结束的赛程、已结束比赛的 summary 和解析后的球员数据表写入后不再变化，
+进程重启后直接从磁盘读取，不再请求 ESPN。NBA_STORE_PATH 设为空字符串可关闭。
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import espn_client
+
+STORE_PATH = os.environ.get(
+    'NBA_STORE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'nba-today', 'store.sqlite3')
+)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS schedules (date TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS summaries (event_id TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS box_scores (event_id TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)',
+)
+KEY_COLUMNS = {'schedules': 'date', 'summaries': 'event_id', 'box_scores': 'event_id'}
+BOX_SCORE_FORMAT = 2  # 解析结果格式变化时递增，旧格式的条目视为未命中（2：球员名改存英文）
+
+
+class GameStore:
+    """线程安全的 SQLite 存储；读写出错时视为未命中，不影响页面"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _get(self, table, key):
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f'SELECT payload FROM {table} WHERE {KEY_COLUMNS[table]} = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _put(self, table, key, payload):
+        try:
+            with self._lock:
+                self._conn.execute(f'INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)', (key, payload, time.time()))
+                self.writes += 1
+        except sqlite3.Error:
+            pass
+
+    def get_schedule(self, date_str):
+        """全部结束的赛程（北京时间日期 YYYY-MM-DD），没有时返回 None"""
+        payload = self._get('schedules', date_str)
+        return espn_client.decode_json(payload) if payload is not None else None
+
+    def put_schedule(self, date_str, schedule):
+        self._put('schedules', date_str, json.dumps(schedule, ensure_ascii=False).encode('utf-8'))
+
+    def get_summary(self, event_id):
+        """已结束比赛的 summary（裁剪后的数据，含内容标记）"""
+        payload = self._get('summaries', event_id)
+        return espn_client.decode_json(payload) if payload is not None else None
+
+    def put_summary(self, event_id, data):
+        self._put('summaries', event_id, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def get_box_score(self, event_id):
+        """已结束比赛解析后的 (客队, 主队) 球员数据表；由其他 pandas 版本写入等无法还原时视为未命中"""
+        payload = self._get('box_scores', f"{event_id}:v{BOX_SCORE_FORMAT}")
+        if payload is None:
+            return None
+        try:
+            return pickle.loads(payload)
+        except Exception:
+            return None
+
+    def put_box_score(self, event_id, box_score):
+        self._put('box_scores', f"{event_id}:v{BOX_SCORE_FORMAT}",
+                  pickle.dumps(box_score, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def stats(self):
+        try:
+            with self._lock:
+                counts = {
+                    table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                    for table in KEY_COLUMNS
+                }
+        except sqlite3.Error:
+            counts = {}
+        return dict(counts, path=self.path, hits=self.hits, misses=self.misses, writes=self.writes)
+
+
+_lock = threading.Lock()
+_store = None
+_opened = False
+
+
+def get_store():
+    """进程级共享存储；未配置路径或无法打开时返回 None"""
+    global _store, _opened
+    if not _opened:
+        with _lock:
+            if not _opened:
+                if STORE_PATH:
+                    try:
+                        os.makedirs(os.path.dirname(os.path.abspath(STORE_PATH)), exist_ok=True)
+                        _store = GameStore(STORE_PATH)
+                    except (OSError, sqlite3.Error):
+                        _store = None
+                _opened = True
+    return _store
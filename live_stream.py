@@ -0,0 +1,102 @@
+"""比分实时推送旁路服务（Server-Sent Events），与 Streamlit 页面运行在同一进程
+
+/metrics 输出 Prometheus 文本格式的性能指标。
+客户端连接 /events?date=YYYY-MM-DD 后，先收到当天每场比赛的完整数据，
+之后只在某场比赛数据变化时收到该场比赛的增量消息，无需重新执行 app.py。
+每个日期会启动一个后台轮询器，因此只接受页面日期选择器范围内的日期；
+服务默认只监听本机，需要对外提供时显式传入 host。
+"""
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import metrics
+from time_utils import now_beijing
+
+HEARTBEAT_INTERVAL = 15  # 无更新时发送心跳的间隔（秒）
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_WINDOW_DAYS = 3  # 只接受北京时间今天前后各几天
+
+
+def format_game_message(event_id, revision, changes, info):
+    """一场比赛的 SSE 消息：event 为 game，data 为 JSON"""
+    payload = {'id': event_id, 'revision': revision, 'changes': list(changes), 'info': info}
+    return f"id: {event_id}-{revision}\nevent: game\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def date_in_window(date_str, window_days):
+    """date_str 为 YYYY-MM-DD 且在北京时间今天前后 window_days 天内"""
+    try:
+        date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return False
+    return abs((date - now_beijing().date()).days) <= window_days
+
+
+def make_handler(poller_provider, window_days=DEFAULT_WINDOW_DAYS):
+    """poller_provider(date_str) 需返回带 get_snapshot / wait_for_update 的轮询器"""
+
+    class LiveStreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/metrics':
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if url.path != '/events':
+                self.send_error(404)
+                return
+            date_str = parse_qs(url.query).get('date', [''])[0]
+            if not date_in_window(date_str, window_days):
+                self.send_error(400, f'date must be YYYY-MM-DD within {window_days} days of today')
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            try:
+                self._stream(poller_provider(date_str))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _stream(self, poller):
+            snapshot = poller.get_snapshot()
+            seen = {}  # 比赛ID -> 已推送的版本号
+            version = None
+            while True:
+                if snapshot is not None and snapshot['version'] != version:
+                    version = snapshot['version']
+                    for event_id, revision in snapshot['revisions'].items():
+                        if seen.get(event_id) == revision:
+                            continue
+                        changes = snapshot['changes'].get(event_id, ())
+                        game = snapshot['games'].get(event_id)
+                        info = game.to_dict() if game is not None else None
+                        self.wfile.write(format_game_message(event_id, revision, changes, info).encode('utf-8'))
+                        seen[event_id] = revision
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+                snapshot = poller.wait_for_update(version, HEARTBEAT_INTERVAL)
+
+        def log_message(self, format, *args):
+            pass
+
+    return LiveStreamHandler
+
+
+def start_server(poller_provider, host=DEFAULT_HOST, port=8502, window_days=DEFAULT_WINDOW_DAYS):
+    """在后台线程启动推送服务，返回 server 对象（server.shutdown() 可停止）"""
+    server = ThreadingHTTPServer((host, port), make_handler(poller_provider, window_days))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='nba-live-stream', daemon=True)
+    thread.start()
+    return server
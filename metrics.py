@@ -0,0 +1,148 @@
+"""进程级性能指标：页面各阶段耗时、ESPN 接口延迟直方图和缓存命中率，输出 Prometheus 文本格式
+
+记录一次耗时只需一次加锁和一次二分查找，可以在生产环境常开。
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一格为 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """按桶边界估算分位数"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class HistogramFamily:
+    """按一个标签区分的一组直方图"""
+
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            histogram = self._histograms.get(label_value)
+            if histogram is None:
+                histogram = self._histograms[label_value] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def summary(self):
+        """{标签值: {'count', 'avg_ms', 'p95_ms', 'max_ms'}}"""
+        with self._lock:
+            return {
+                label_value: {
+                    'count': h.count,
+                    'avg_ms': h.sum / h.count * 1000 if h.count else 0.0,
+                    'p95_ms': h.quantile(0.95) * 1000,
+                    'max_ms': h.max * 1000,
+                }
+                for label_value, h in self._histograms.items()
+            }
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, h in sorted(self._histograms.items()):
+                label = f'{self.label}="{label_value}"'
+                cumulative = 0
+                for bound, n in zip(self.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {h.count}')
+                lines.append(f'{self.name}_sum{{{label}}} {h.sum:.6f}')
+                lines.append(f'{self.name}_count{{{label}}} {h.count}')
+        return lines
+
+
+STAGE_SECONDS = HistogramFamily('nba_stage_seconds', 'Time spent in each page or poller stage.', 'stage')
+UPSTREAM_SECONDS = HistogramFamily(
+    'nba_upstream_request_seconds', 'ESPN request latency by endpoint.', 'endpoint'
+)
+
+_collectors_lock = threading.Lock()
+_collectors = {}
+
+
+@contextmanager
+def timed(stage):
+    """记录 with 块耗时到 nba_stage_seconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(stage, time.perf_counter() - started)
+
+
+def observe_stage(stage, seconds):
+    STAGE_SECONDS.observe(stage, seconds)
+
+
+def observe_upstream(endpoint, seconds):
+    UPSTREAM_SECONDS.observe(endpoint, seconds)
+
+
+def register_collector(name, collect):
+    """注册（或替换）一个即时指标采集函数。
+
+    collect() 返回 [(指标名, 说明, 'gauge'/'counter', {标签: 值}, 数值), ...]
+    """
+    with _collectors_lock:
+        _collectors[name] = collect
+
+
+def collect_samples():
+    with _collectors_lock:
+        collectors = list(_collectors.values())
+    samples = []
+    for collect in collectors:
+        try:
+            samples.extend(collect())
+        except Exception:
+            continue
+    return samples
+
+
+def render_prometheus():
+    """全部指标的 Prometheus 文本格式"""
+    lines = STAGE_SECONDS.render() + UPSTREAM_SECONDS.render()
+    described = set()
+    for name, help_text, metric_type, labels, value in sorted(collect_samples(), key=lambda sample: sample[0]):
+        if name not in described:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            described.add(name)
+        label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return '\n'.join(lines) + '\n'
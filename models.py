@@ -0,0 +1,130 @@
+"""比赛数据的紧凑领域模型（__slots__ 数据类），每份赛程数据只构建一次，渲染和推送共用"""
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from time_utils import parse_espn_time, to_beijing
+
+
+@dataclass(frozen=True, slots=True)
+class QuarterScore:
+    quarter_num: int
+    label: str
+    away_score: int
+    home_score: int
+
+
+@dataclass(frozen=True, slots=True)
+class TeamLine:
+    name: str  # ESPN 英文队名，显示前再翻译
+    logo: str
+    score: str  # 原样显示的比分
+    score_int: int
+
+
+@dataclass(frozen=True, slots=True)
+class Game:
+    id: str
+    tip_off: Optional[datetime]  # UTC 开赛时间
+    tip_off_beijing: Optional[datetime]  # 北京时间开赛时间，构建时转换一次
+    state: str  # 'pre' / 'in' / 'post'
+    description: str
+    period: int
+    clock: str
+    clock_seconds: int
+    period_text: str
+    away: TeamLine
+    home: TeamLine
+    quarter_scores: Tuple[QuarterScore, ...]
+
+    def to_dict(self):
+        """转成可 JSON 序列化的字典"""
+        data = asdict(self)
+        data['tip_off'] = self.tip_off.isoformat() if self.tip_off else None
+        data['tip_off_beijing'] = self.tip_off_beijing.isoformat() if self.tip_off_beijing else None
+        return data
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def clock_to_seconds(clock):
+    """'5:12' -> 312，'45' -> 45，无法解析时为 0"""
+    if not clock or clock in ('0:00', '0'):
+        return 0
+    try:
+        if ':' in clock:
+            minutes, seconds = clock.split(':')
+            return int(minutes) * 60 + int(float(seconds))
+        return int(float(clock))
+    except ValueError:
+        return 0
+
+
+def quarter_label(quarter_num):
+    return f"第{quarter_num}节" if quarter_num <= 4 else f"加时{quarter_num - 4}"
+
+
+def period_text(state, period):
+    if state == 'in':
+        return quarter_label(period)
+    if state == 'post':
+        return "比赛结束"
+    return "未开始"
+
+
+def _team_line(competitor):
+    team = competitor.get('team', {})
+    score = str(competitor.get('score') or '0')  # ESPN 未开赛时可能给 null
+    return TeamLine(
+        name=team.get('displayName', ''),
+        logo=team.get('logo', ''),
+        score=score,
+        score_int=_to_int(score),
+    )
+
+
+def build_game(event):
+    """从 ESPN 赛程中的一场比赛构建 Game；缺少对阵双方时返回 None"""
+    competition = (event.get('competitions') or [{}])[0]
+    competitors = competition.get('competitors', [])
+    if len(competitors) < 2:
+        return None
+    status = competition.get('status', {})
+    status_type = event.get('status', {}).get('type') or status.get('type', {})
+    state = status_type.get('state', 'pre')
+    period = status.get('period', 0) or 0
+    clock = status.get('displayClock', '') or ''
+
+    # 第一个是客场队伍，第二个是主场队伍
+    away, home = competitors[0], competitors[1]
+    away_lines = away.get('linescores', [])
+    home_lines = home.get('linescores', [])
+    quarter_scores = tuple(
+        QuarterScore(
+            quarter_num=i + 1,
+            label=quarter_label(i + 1),
+            away_score=_to_int(away_lines[i].get('value', 0)),
+            home_score=_to_int(home_lines[i].get('value', 0)),
+        )
+        for i in range(min(len(away_lines), len(home_lines)))
+    )
+    tip_off = parse_espn_time(event.get('date'))
+    return Game(
+        id=event['id'],
+        tip_off=tip_off,
+        tip_off_beijing=to_beijing(tip_off),
+        state=state,
+        description=status_type.get('description', '未开始'),
+        period=period,
+        clock=clock,
+        clock_seconds=clock_to_seconds(clock),
+        period_text=period_text(state, period),
+        away=_team_line(away),
+        home=_team_line(home),
+        quarter_scores=quarter_scores,
+    )
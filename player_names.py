@@ -0,0 +1,108 @@
+"""球员译名索引：翻译表在加载时编译成规范化索引，之后每次翻译只需查一两次字典
+
+索引同时收录原始写法和规范化写法（去掉重音、标点和大小写差异），
+并预先生成带后缀（Jr./II 等）的译名。编译结果以 marshal 快照保存，
+页面启动时直接读取，不导入 translations 模块。构建镜像时预先生成快照：
+    RUN python replay.py compile-translations
+快照默认写在 __pycache__/translations_index.marshal，NBA_TRANSLATIONS_INDEX 可指定其他路径。
+快照按 translations.py 的内容和后缀表校验，不一致或不存在时页面自行重建（目录只读时只在内存中使用）。
+"""
+import functools
+import hashlib
+import marshal
+import os
+import re
+import unicodedata
+
+PLAYER_SUFFIX_MAP = {'Jr.':'小','Jr':'小','Sr.':'老','Sr':'老','II':'二世','III':'三世','IV':'四世','V':'五世'}
+
+
+def normalize_player_name(name):
+    """规范化球员名：去掉重音、标点和大小写差异，合并空白"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r"[^\w\s]", '', stripped.lower()).split())
+
+
+def build_player_index(player_translation):
+    """把球员翻译表编译成一次查表即可命中的索引；翻译表中已有的条目优先于自动生成的后缀译名"""
+    index = {}
+    for name_en, name_cn in player_translation.items():
+        index[name_en] = name_cn
+        index.setdefault(normalize_player_name(name_en), name_cn)
+    for name_en, name_cn in player_translation.items():
+        for suffix, suffix_cn in PLAYER_SUFFIX_MAP.items():
+            suffixed = f"{name_en} {suffix}"
+            index.setdefault(suffixed, f"{name_cn}{suffix_cn}")
+            index.setdefault(normalize_player_name(suffixed), f"{name_cn}{suffix_cn}")
+    return index
+
+
+# 查找时的规范化结果单独缓存：未收录的球员每次重跑都会再查，不必每次重做 Unicode 分解和正则替换
+_normalize_for_lookup = functools.lru_cache(maxsize=4096)(normalize_player_name)
+
+
+def lookup_player_name(player_index, name):
+    """先按原样查找，未命中再按规范化写法查找；都没有时返回 None"""
+    translated = player_index.get(name)
+    if translated is None:
+        translated = player_index.get(_normalize_for_lookup(name))
+    return translated
+
+
+# ====== 预编译快照 ======
+TRANSLATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations.py')
+TRANSLATIONS_INDEX_PATH = os.environ.get('NBA_TRANSLATIONS_INDEX') or os.path.join(
+    os.path.dirname(TRANSLATIONS_PATH), '__pycache__', 'translations_index.marshal'
+)
+
+
+def translations_key():
+    """快照校验键：translations.py 的内容摘要和后缀表（镜像中文件的修改时间不可靠，不用 mtime）"""
+    with open(TRANSLATIONS_PATH, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return digest, tuple(PLAYER_SUFFIX_MAP.items())
+
+
+def _write_snapshot(path, key, team_translation, player_index):
+    """原子写入快照，多个进程同时写也不会读到半个文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        marshal.dump((key, team_translation, player_index), f)
+    os.replace(tmp_path, path)
+
+
+def compile_translations(path=None):
+    """编译翻译表并写入快照，返回 (快照路径, 索引条目数)；用于构建镜像时预先生成"""
+    from translations import TEAM_TRANSLATION, PLAYER_TRANSLATION
+    path = path or TRANSLATIONS_INDEX_PATH
+    player_index = build_player_index(PLAYER_TRANSLATION)
+    _write_snapshot(path, translations_key(), TEAM_TRANSLATION, player_index)
+    return path, len(player_index)
+
+
+def load_compiled_translations():
+    """读取预编译的翻译索引，返回 (球队译名表, 球员索引)；快照缺失或过期时重建，写不进去时只在内存中使用"""
+    try:
+        key = translations_key()
+    except OSError:
+        key = None
+    if key is not None:
+        try:
+            # 一次读入再解码：marshal.load 直接读文件对象时按小块多次读取，慢好几倍
+            with open(TRANSLATIONS_INDEX_PATH, 'rb') as f:
+                cached_key, team_translation, player_index = marshal.loads(f.read())
+            if cached_key == key:
+                return team_translation, player_index
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    from translations import TEAM_TRANSLATION, PLAYER_TRANSLATION
+    player_index = build_player_index(PLAYER_TRANSLATION)
+    if key is not None:
+        try:
+            _write_snapshot(TRANSLATIONS_INDEX_PATH, key, TEAM_TRANSLATION, player_index)
+        except OSError:
+            pass
+    return TEAM_TRANSLATION, player_index
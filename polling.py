@@ -0,0 +1,70 @@
+"""自适应轮询间隔：按比赛阶段决定后台轮询和比赛卡片自动刷新的间隔
+
+直播中按关键时刻、节间、中场、停表放慢或加快；未开始的比赛等到临近开赛再密集轮询。
+"""
+CRUNCH_TIME_SECONDS = 300  # 第四节及加时剩余时间不超过该值视为关键时刻
+POLL_INTERVAL = 5  # 直播中正常比赛时间的轮询间隔（秒），与会话数量无关
+PHASE_POLL_INTERVALS = {
+    'crunch': 2,  # 关键时刻
+    'live': POLL_INTERVAL,
+    'break': 20,  # 节间休息
+    'halftime': 60,  # 中场休息
+}
+STOPPAGE_AFTER = 20  # 直播中比赛钟超过该秒数未走动视为停表（暂停、罚球、回看）
+STOPPAGE_POLL_INTERVAL = 15
+PRE_TIPOFF_LEAD = 120  # 开赛前提前多久恢复密集轮询（秒）
+PRE_POLL_INTERVAL = 30  # 临近或已过开赛时间但仍未开始时
+IDLE_POLL_INTERVAL = 1800  # 没有直播和待开赛比赛时，也是轮询间隔上限
+# 比赛卡片自动刷新间隔上限（秒）：开赛时间调整等变化最迟在这么久之后被卡片发现
+CARD_MAX_INTERVAL = 600
+
+
+def game_phase(game):
+    """比赛所处阶段：'pre' / 'post'，直播中细分为 'crunch' / 'live' / 'break' / 'halftime'"""
+    if game.state != 'in':
+        return game.state
+    if game.clock_seconds == 0:
+        return 'halftime' if game.period == 2 else 'break'
+    if game.period >= 4 and game.clock_seconds <= CRUNCH_TIME_SECONDS:
+        return 'crunch'
+    return 'live'
+
+
+def game_poll_delay(game, now, stalled_for=0):
+    """单场比赛距下次需要拉取的秒数；已结束的比赛返回 None"""
+    phase = game_phase(game)
+    if phase == 'post':
+        return None
+    if phase == 'pre':
+        if game.tip_off is None:
+            return PRE_POLL_INTERVAL
+        return max(PRE_POLL_INTERVAL, (game.tip_off - now).total_seconds() - PRE_TIPOFF_LEAD)
+    if phase in ('live', 'crunch') and stalled_for >= STOPPAGE_AFTER:
+        return STOPPAGE_POLL_INTERVAL
+    return PHASE_POLL_INTERVALS[phase]
+
+
+def next_poll_delay(games, now, stalled=None):
+    """所有比赛中最早需要拉取的时间；全部结束或没有比赛时为 IDLE_POLL_INTERVAL"""
+    stalled = stalled or {}
+    delays = [game_poll_delay(game, now, stalled.get(game.id, 0)) for game in games]
+    return min([d for d in delays if d is not None] + [IDLE_POLL_INTERVAL])
+
+
+def card_refresh_interval(game, auto_refresh, refresh_interval, now):
+    """每场比赛卡片 fragment 的自动刷新间隔：不快于设置间隔，也不快于该场比赛的轮询间隔，
+    不超过 CARD_MAX_INTERVAL；已结束的比赛不刷新"""
+    if not auto_refresh:
+        return None
+    delay = game_poll_delay(game, now)
+    if delay is None:
+        return None
+    return min(max(refresh_interval, delay), CARD_MAX_INTERVAL)
+
+
+def card_interval_outdated(game, run_every, now):
+    """未开始比赛的卡片间隔只在整页运行时确定，fragment 自己重跑时沿用旧值；
+    临近开赛、该场比赛需要的轮询间隔已短于卡片间隔时返回 True，需要整页重跑重新计算"""
+    if run_every is None or run_every <= PRE_POLL_INTERVAL or game_phase(game) != 'pre':
+        return False
+    return game_poll_delay(game, now) < run_every
@@ -0,0 +1,777 @@
+"""ESPN 数据录制与回放工具，用于离线运行页面和压测
+
+录制一整晚的赛程和球员数据：
+    python replay.py record --dates 20260115 --out night.jsonl.gz --interval 10
+按模拟时钟回放（speed 为时间倍速）：
+    python replay.py serve --archive night.jsonl.gz --port 8600 --speed 10
+    ESPN_BASE_URL=http://127.0.0.1:8600 streamlit run app.py
+压测（N 个模拟会话，统计每次重跑耗时、发往浏览器的消息数和字节数、上游请求数和内存）：
+    python replay.py bench --archive night.jsonl.gz --sessions 20 --reruns 5 --speed 60
+对比改动前后时，用 --app 指向另一份检出（该目录下的模块优先导入）：
+    git worktree add /tmp/before <提交>
+    python replay.py bench --archive night.jsonl.gz --app /tmp/before/app.py
+并发拉取对比（回放服务注入延迟，比较旧的 5 线程池与现在的共享连接池 + 异步截止时间）：
+    python replay.py fanout --archive night.jsonl.gz --games 15 --latency 0.8
+球员译名查找对比（归档中整晚的球员名，旧的逐次拆分查找与预编译索引）：
+    python replay.py translate --archive night.jsonl.gz --repeat 200
+球员数据解析对比（归档中整晚的 summary，旧的逐行字符串解析与列式解析）：
+    python replay.py parse --archive night.jsonl.gz --repeat 20
+JSON 解码后端对比（归档中最后一次录制的赛程和 summary 原始响应，比较已安装的各个后端）：
+    python replay.py decode --archive night.jsonl.gz --repeat 50
+比赛模型内存对比（归档中的赛程补足到 N 场，旧的每次重跑生成的节次字典与 __slots__ 模型）：
+    python replay.py models --archive night.jsonl.gz --games 15
+启动耗时（每个模块在全新解释器中的导入耗时）：
+    python replay.py startup
+预编译球员译名快照（构建镜像时执行，页面启动时直接读取，不再导入和编译翻译表）：
+    python replay.py compile-translations [--out 路径，默认 NBA_TRANSLATIONS_INDEX 或 __pycache__ 下]
+"""
+import argparse
+import bisect
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 每个接口用哪个查询参数区分不同的数据
+ENDPOINT_KEYS = {'scoreboard': 'dates', 'summary': 'event'}
+
+
+# ====== 录制 ======
+def record(dates, out_path, interval=10, duration=6 * 3600):
+    """定时拉取指定 ESPN 日期（YYYYMMDD）的赛程和球员数据写入归档，全部比赛结束后自动停止"""
+    import espn_client
+
+    started = time.time()
+    finished_summaries = set()
+    with gzip.open(out_path, 'at', encoding='utf-8') as archive:
+        def save(endpoint, key, resp):
+            archive.write(json.dumps({
+                't': round(time.time() - started, 3),
+                'endpoint': endpoint,
+                'key': key,
+                'status': resp.status_code,
+                'body': resp.text,
+            }, ensure_ascii=False) + '\n')
+
+        while time.time() - started < duration:
+            resp = espn_client.get('scoreboard', params={'dates': dates, 'lang': 'zh', 'region': 'cn'})
+            save('scoreboard', dates, resp)
+            events = resp.json().get('events', []) if resp.status_code == 200 else []
+            states = {}
+            for event in events:
+                states[event['id']] = event.get('status', {}).get('type', {}).get('state', 'pre')
+            for event_id, state in states.items():
+                if state == 'pre' or event_id in finished_summaries:
+                    continue
+                save('summary', event_id, espn_client.get('summary', params={'event': event_id}))
+                if state == 'post':
+                    finished_summaries.add(event_id)
+            archive.flush()
+            if states and all(state == 'post' for state in states.values()):
+                break
+            time.sleep(interval)
+
+
+# ====== 回放 ======
+class ReplayArchive:
+    """按 (接口, 参数) 保存按时间排序的录制响应，按模拟时间取最近一次"""
+
+    def __init__(self, path):
+        self._records = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                item = json.loads(line)
+                body = item['body'].encode('utf-8')
+                etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+                self._records.setdefault((item['endpoint'], item['key']), []).append(
+                    (item['t'], item['status'], body, etag)
+                )
+        for records in self._records.values():
+            records.sort(key=lambda record: record[0])
+        self._times = {key: [record[0] for record in records] for key, records in self._records.items()}
+        self.duration = max((times[-1] for times in self._times.values()), default=0)
+
+    def latest_bodies(self, endpoint):
+        """某个接口每个参数最后一次成功录制的响应体：{参数: 响应字节}"""
+        bodies = {}
+        for (name, key), records in self._records.items():
+            if name == endpoint:
+                ok = [record for record in records if record[1] == 200]
+                if ok:
+                    bodies[key] = ok[-1][2]
+        return bodies
+
+    def lookup(self, endpoint, key, sim_time):
+        records = self._records.get((endpoint, key))
+        if records is None and endpoint == 'scoreboard':
+            # 只录制了一个日期时，任何日期都回放这一份赛程
+            scoreboards = [k for k in self._records if k[0] == 'scoreboard']
+            if len(scoreboards) == 1:
+                records = self._records[scoreboards[0]]
+                key = scoreboards[0][1]
+        if records is None:
+            return None
+        index = bisect.bisect_right(self._times[(endpoint, key)], sim_time) - 1
+        return records[max(index, 0)]
+
+
+class ReplayClock:
+    """模拟时钟：从 offset 秒开始，按 speed 倍速前进"""
+
+    def __init__(self, speed=1.0, offset=0.0):
+        self.speed = speed
+        self.offset = offset
+        self._started = time.monotonic()
+
+    def now(self):
+        return self.offset + (time.monotonic() - self._started) * self.speed
+
+
+def make_replay_handler(archive, clock, counters, lock, latency=0.0):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+            if endpoint == '__stats':
+                with lock:
+                    body = json.dumps({'sim_time': clock.now(), 'requests': dict(counters)}).encode('utf-8')
+                self._send(200, body)
+                return
+            with lock:
+                counters[endpoint] = counters.get(endpoint, 0) + 1
+            if latency:
+                time.sleep(latency)  # 模拟上游响应延迟
+            key = parse_qs(url.query).get(ENDPOINT_KEYS.get(endpoint, ''), [''])[0]
+            record = archive.lookup(endpoint, key, clock.now())
+            if record is None:
+                self.send_error(404)
+                return
+            _, status, body, etag = record
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self._send(status, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 注入延迟时客户端超时断开属于预期情况，不打印堆栈
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_replay_server(archive_path, host='127.0.0.1', port=0, speed=1.0, offset=0.0, latency=0.0):
+    """在后台线程启动回放服务，返回 (server, counters)；counters 为各接口被请求的次数，latency 为每个请求注入的延迟（秒）"""
+    archive = ReplayArchive(archive_path)
+    counters = {}
+    handler = make_replay_handler(archive, ReplayClock(speed, offset), counters, threading.Lock(), latency)
+    server = ReplayServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='nba-replay', daemon=True).start()
+    return server, counters
+
+
+# ====== 压测 ======
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def bench(archive_path, sessions=10, reruns=5, speed=60.0, offset=0.0, pause=1.0, app_path=None):
+    """用回放数据运行 N 个模拟会话，统计每次重跑耗时、消息数和字节数、上游请求数和内存峰值"""
+    import tracemalloc
+
+    app_path = os.path.abspath(app_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'))
+    # 被测页面所在目录优先导入，对比其他检出时不会混用本目录的模块
+    sys.path.insert(0, os.path.dirname(app_path))
+    import espn_client
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+    from streamlit.testing.v1 import AppTest
+
+    server, counters = start_replay_server(archive_path, speed=speed, offset=offset)
+    espn_client.ESPN_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault('NBA_STREAM_PORT', '0')
+    os.environ.setdefault('NBA_STORE_PATH', '')  # 不读本地存储，统计真实的上游请求
+
+    # 统计每次重跑发往浏览器的 delta 消息数和序列化后的字节数（合并前，即最坏情况下的发送量）
+    sent = {'deltas': 0, 'bytes': 0}
+
+    def count_message(msg):
+        if msg.HasField('delta'):
+            sent['deltas'] += 1
+            sent['bytes'] += msg.ByteSize()
+
+    ForwardMsgQueue.on_before_enqueue_msg(count_message)
+    tracemalloc.start()
+    apps = [AppTest.from_file(app_path, default_timeout=60) for _ in range(sessions)]
+    latencies, deltas, payload = [], [], []
+    started = time.perf_counter()
+    try:
+        for _ in range(reruns):
+            for app in apps:
+                sent.update(deltas=0, bytes=0)
+                t0 = time.perf_counter()
+                app.run()
+                latencies.append(time.perf_counter() - t0)
+                deltas.append(sent['deltas'])
+                payload.append(sent['bytes'])
+            time.sleep(pause)
+    finally:
+        ForwardMsgQueue.on_before_enqueue_msg(None)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    server.shutdown()
+
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'rerun_ms_p50': round(statistics.median(latencies) * 1000, 1),
+        'rerun_ms_p95': round(_percentile(latencies, 0.95) * 1000, 1),
+        'rerun_ms_max': round(max(latencies) * 1000, 1),
+        'delta_msgs_per_rerun': statistics.median(deltas),
+        'delta_kb_per_rerun': round(statistics.median(payload) / 1024, 1),
+        'upstream_requests': dict(counters),
+        'upstream_requests_per_min': round(sum(counters.values()) / elapsed * 60, 1),
+        'peak_memory_mb': round(peak / 1024 / 1024, 1),
+    }
+
+
+# ====== 并发拉取对比 ======
+def archive_event_ids(archive_path):
+    """归档中录制过 summary 的比赛 ID"""
+    return sorted(ReplayArchive(archive_path).latest_bodies('summary'))
+
+
+def fetch_summaries_executor(base_url, event_ids, timeout=3):
+    """改造前的做法：每次新建最多 5 个线程的线程池，每个请求单独建立连接，按批等待超时"""
+    import requests
+
+    done = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(5, len(event_ids))) as executor:
+        futures = [executor.submit(requests.get, f'{base_url}/summary', params={'event': eid}, timeout=timeout)
+                   for eid in event_ids]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                resp = future.result()
+                resp.raise_for_status()
+                resp.json()
+                done += 1
+            except Exception:
+                continue
+    return done
+
+
+def fetch_summaries_async(event_ids, executor):
+    """现在的做法：页面使用的 summary_fetch 引擎和下载函数（共享连接池和线程池，单场和整批截止时间）；
+    不经过页面的 st.cache_data，统计的是缓存未命中时的拉取"""
+    from summary_fetch import download_summary, gather_in_executor
+
+    return len(gather_in_executor(download_summary, [(eid,) for eid in event_ids], executor))
+
+
+def fanout(archive_path, games=15, latency=0.8, rounds=3):
+    """回放服务注入固定延迟，分别用两种方式拉取 games 场比赛的 summary，统计每轮耗时和完成场数"""
+    os.environ.setdefault('NBA_STORE_PATH', '')  # 不读本地存储，每轮都真实请求
+    import espn_client
+    import summary_fetch
+
+    event_ids = archive_event_ids(archive_path)
+    if not event_ids:
+        raise SystemExit(f"{archive_path} 中没有录制 summary")
+    # 归档中的比赛不足时循环使用，模拟一整晚的场次
+    event_ids = [event_ids[i % len(event_ids)] for i in range(games)]
+
+    server, counters = start_replay_server(archive_path, latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    espn_client.ESPN_BASE_URL = base_url
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=summary_fetch.FETCH_CONCURRENCY)
+    strategies = {
+        'executor_5_workers': lambda: fetch_summaries_executor(base_url, event_ids),
+        'async_shared_pool': lambda: fetch_summaries_async(event_ids, executor),
+    }
+    report = {'games': games, 'latency_s': latency, 'concurrency': summary_fetch.FETCH_CONCURRENCY}
+    try:
+        for name, run in strategies.items():
+            walls, completed = [], []
+            for _ in range(rounds):
+                # 每轮都清空校验缓存：否则从第二轮起得到 304 或直接命中已固定的结果，与每次下载完整响应的旧做法不可比
+                espn_client.clear_validators()
+                t0 = time.perf_counter()
+                completed.append(run())
+                walls.append(time.perf_counter() - t0)
+            report[name] = {
+                'wall_ms_median': round(statistics.median(walls) * 1000, 1),
+                'wall_ms_max': round(max(walls) * 1000, 1),
+                'completed': min(completed),
+            }
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        server.shutdown()
+    pool = espn_client.pool_stats()
+    report['pool'] = {key: pool[key] for key in ('requests', 'errors', 'connections_created', 'connections_reused')}
+    report['upstream_requests'] = dict(counters)
+    return report
+
+
+# ====== 译名查找对比 ======
+def archive_player_names(archive_path):
+    """归档中每场比赛最后一份 summary 里的全部球员名，即一整晚要翻译的名字"""
+    names = []
+    for body in ReplayArchive(archive_path).latest_bodies('summary').values():
+        for team in json.loads(body).get('boxscore', {}).get('players', []):
+            for group in team.get('statistics', []):
+                names.extend(athlete.get('athlete', {}).get('displayName', '') for athlete in group.get('athletes', []))
+    return names
+
+
+def translate_player_name_legacy(player_translation, name):
+    """改造前的译名查找：每次调用都拆分球员名、重建后缀表"""
+    if not name:
+        return name
+    name = name.strip()
+    if name in player_translation:
+        return player_translation[name]
+    name_parts = name.split()
+    if len(name_parts) > 1:
+        suffixes = ['Jr.', 'Jr', 'Sr.', 'Sr', 'II', 'III', 'IV', 'V']
+        if name_parts[-1] in suffixes:
+            base_name = ' '.join(name_parts[:-1])
+            if base_name in player_translation:
+                translated = player_translation[base_name]
+                suffix_map = {'Jr.':'小','Jr':'小','Sr.':'老','Sr':'老','II':'二世','III':'三世','IV':'四世','V':'五世'}
+                return f"{translated}{suffix_map.get(name_parts[-1], '')}"
+    return name
+
+
+def translate_bench(archive_path, repeat=200):
+    """把整晚的球员名各翻译 repeat 遍，比较每次查找耗时和命中数"""
+    from player_names import build_player_index, lookup_player_name
+    from translations import PLAYER_TRANSLATION
+
+    names = archive_player_names(archive_path)
+    if not names:
+        raise SystemExit(f"{archive_path} 中没有录制 summary")
+    t0 = time.perf_counter()
+    player_index = build_player_index(PLAYER_TRANSLATION)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    strategies = {
+        'legacy_split_lookup': lambda name: translate_player_name_legacy(PLAYER_TRANSLATION, name),
+        'compiled_index': lambda name: lookup_player_name(player_index, name),
+    }
+    report = {'names_per_slate': len(names), 'repeat': repeat, 'index_entries': len(player_index),
+              'index_build_ms': round(build_ms, 1)}
+    for strategy, translate in strategies.items():
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for name in names:
+                translate(name)
+        elapsed = time.perf_counter() - t0
+        translated = sum(1 for name in names if translate(name) not in (None, name))
+        report[strategy] = {
+            'ns_per_lookup': round(elapsed / (repeat * len(names)) * 1e9),
+            'ms_per_slate': round(elapsed / repeat * 1000, 3),
+            'translated': translated,
+        }
+    return report
+
+
+# ====== 球员数据解析对比 ======
+def _format_time_legacy(t):
+    if not t or str(t).strip() in ('0', '0:00', '--', '', 'DNP', 'N/A'):
+        return '0:00'
+    s = str(t).strip()
+    if ':' in s:
+        return s
+    try:
+        return f"{int(float(s))}:00"
+    except ValueError:
+        return s
+
+
+def _safe_int_legacy(value, default=0):
+    if not value:
+        return default
+    try:
+        if '/' in str(value):
+            return int(str(value).split('/')[0])
+        return int(float(str(value)))
+    except ValueError:
+        return default
+
+
+def _extract_team_rows_legacy(team_data):
+    main_stat = None
+    for stat in (team_data or {}).get('statistics', []):
+        if stat.get('athletes') and ('PTS' in stat.get('labels', []) or '得分' in stat.get('labels', [])):
+            main_stat = stat
+            break
+    if not main_stat:
+        return []
+    labels = main_stat.get('labels', [])
+    parsed = []
+    for ath in main_stat.get('athletes', []):
+        athlete_data = ath.get('athlete', {})
+        name_en = str(athlete_data.get('displayName') or athlete_data.get('fullName') or
+                      athlete_data.get('shortName') or ath.get('displayName') or ath.get('name') or '').strip()
+        raw_vals = ath.get('stats', [])
+        if not name_en or name_en in ['DNP', 'N/A', '--', 'null', 'None'] or not raw_vals:
+            continue
+        stat_map = {}
+        for i, label in enumerate(labels):
+            if i < len(raw_vals):
+                stat_map[label] = str(raw_vals[i]).strip() if raw_vals[i] is not None else ''
+        shots = [stat_map.get(k, '0-0').replace('/', '-').split('-') for k in ('FG', '3PT', 'FT')]
+        shots = [f"{p[0]}/{p[1]}" if len(p) > 1 else '0/0' for p in shots]
+        player = {
+            '球员': name_en, '时间': _format_time_legacy(stat_map.get('MIN', '0')), '得分': stat_map.get('PTS', '0'),
+            '投篮': shots[0], '三分': shots[1], '罚球': shots[2],
+            '篮板': stat_map.get('REB', '0'), '助攻': stat_map.get('AST', '0'), '失误': stat_map.get('TO', '0'),
+        }
+        if (_safe_int_legacy(player['得分']) > 0 or _safe_int_legacy(player['篮板']) > 0 or
+                _safe_int_legacy(player['助攻']) > 0 or player['时间'] not in ('0:00', '0')):
+            parsed.append(player)
+    return parsed
+
+
+def parse_player_stats_legacy(game_data):
+    """改造前的解析：每名球员建一个字符串字典，返回 (客队, 主队) 两个列表"""
+    players_section = (game_data or {}).get('boxscore', {}).get('players', [])
+    if len(players_section) < 2:
+        return [], []
+    return _extract_team_rows_legacy(players_section[1]), _extract_team_rows_legacy(players_section[0])
+
+
+def tables_legacy(rows):
+    """改造前的显示：排序时再把字符串转回数字，生成前 10 名和完整两张表"""
+    import pandas as pd
+    top = sorted(rows, key=lambda x: _safe_int_legacy(x['得分'], 0), reverse=True)[:10]
+    simple = pd.DataFrame([{'球员': p['球员'], '时间': p['时间'], '得分': p['得分']} for p in top])
+    full = pd.DataFrame(rows)
+    if not full.empty:
+        full['得分'] = pd.to_numeric(full['得分'], errors='coerce')
+        full = full.sort_values('得分', ascending=False)
+        full['得分'] = full['得分'].astype(str)
+    return simple, full
+
+
+def tables_columnar(df):
+    from box_score import format_box_score
+    ordered = df.sort_values('pts', ascending=False, kind='stable')
+    return format_box_score(ordered.head(10), str, full=False), format_box_score(ordered, str)
+
+
+def parse_bench(archive_path, repeat=20):
+    """把整晚每场比赛最后一份 summary 各解析 repeat 遍，分别统计只解析和解析加生成表格的耗时（翻译不计入）"""
+    from box_score import parse_player_stats
+
+    summaries = [json.loads(body) for body in ReplayArchive(archive_path).latest_bodies('summary').values()]
+    if not summaries:
+        raise SystemExit(f"{archive_path} 中没有录制 summary")
+    strategies = {
+        'legacy_rows': (parse_player_stats_legacy, tables_legacy),
+        'columnar': (parse_player_stats, tables_columnar),
+    }
+    report = {'games': len(summaries), 'repeat': repeat}
+    for strategy, (parse, tables) in strategies.items():
+        parse(summaries[0])  # 预热（首次导入 pandas 等）
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for data in summaries:
+                parse(data)
+        parse_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for data in summaries:
+                for team in parse(data):
+                    tables(team)
+        total_s = time.perf_counter() - t0
+        players = sum(len(team) for data in summaries for team in parse(data))
+        report[strategy] = {
+            'parse_ms_per_slate': round(parse_s / repeat * 1000, 2),
+            'parse_and_tables_ms_per_slate': round(total_s / repeat * 1000, 2),
+            'players': players,
+        }
+    return report
+
+
+# ====== JSON 解码后端对比 ======
+def decode_bench(archive_path, repeat=50):
+    """用每个可用的解码后端把归档中的赛程和 summary 响应各解码 repeat 遍"""
+    import espn_client
+
+    archive = ReplayArchive(archive_path)
+    bodies = {endpoint: list(archive.latest_bodies(endpoint).values()) for endpoint in ENDPOINT_KEYS}
+    if not any(bodies.values()):
+        raise SystemExit(f"{archive_path} 中没有成功的响应")
+    report = {
+        'repeat': repeat,
+        'documents': {endpoint: len(items) for endpoint, items in bodies.items()},
+        'kb_per_slate': round(sum(len(body) for items in bodies.values() for body in items) / 1024, 1),
+        'default_backend': espn_client.JSON_BACKEND,
+    }
+    for backend, decode in espn_client.JSON_DECODERS.items():
+        results = {}
+        for endpoint, items in bodies.items():
+            if not items:
+                continue
+            size = sum(len(body) for body in items)
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                for body in items:
+                    decode(body)
+            elapsed = time.perf_counter() - t0
+            results[endpoint] = {
+                'ms_per_slate': round(elapsed / repeat * 1000, 3),
+                'mb_per_s': round(size * repeat / elapsed / 1024 / 1024, 1),
+            }
+        report[backend] = results
+    return report
+
+
+# ====== 比赛模型内存对比 ======
+def game_period_info_legacy(event):
+    """改造前每次重跑为每场比赛生成的节次信息字典（含每节比分字典列表）"""
+    competition = event.get('competitions', [{}])[0]
+    status = competition.get('status', {})
+    status_type = status.get('type', {})
+    period, clock = status.get('period', 0), status.get('displayClock', '')
+    clock_seconds = 0
+    if clock and clock not in ('0:00', '0'):
+        try:
+            minutes, _, seconds = clock.rpartition(':')
+            clock_seconds = int(minutes or 0) * 60 + int(float(seconds))
+        except ValueError:
+            clock_seconds = 0
+    state = status_type.get('state', 'pre')
+    competitors = competition.get('competitors', [])
+    away_score = home_score = 0
+    quarter_scores = []
+    if len(competitors) >= 2:
+        away_score, home_score = competitors[0].get('score', '0'), competitors[1].get('score', '0')
+        away_lines, home_lines = competitors[0].get('linescores', []), competitors[1].get('linescores', [])
+        for i in range(min(len(away_lines), len(home_lines))):
+            quarter_num = i + 1
+            quarter_scores.append({
+                'quarter': f"第{quarter_num}节" if quarter_num <= 4 else f"加时{quarter_num - 4}",
+                'away_score': away_lines[i].get('value', 0),
+                'home_score': home_lines[i].get('value', 0),
+                'quarter_num': quarter_num,
+            })
+    if state == 'in':
+        period_text = f"第{period}节" if period <= 4 else f"加时{period - 4}"
+    else:
+        period_text = "比赛结束" if state == 'post' else "未开始"
+    return {
+        'period': period, 'clock': clock, 'clock_seconds': clock_seconds, 'period_text': period_text,
+        'quarter_scores': quarter_scores, 'state': state, 'description': status_type.get('description', ''),
+        'away_score': away_score, 'home_score': home_score,
+    }
+
+
+def slate_events(archive_path, games=15):
+    """归档中最后一份赛程的比赛；不足 games 场时复制已有比赛（换新 ID）补足"""
+    import copy
+
+    scoreboards = ReplayArchive(archive_path).latest_bodies('scoreboard')
+    events = [event for body in scoreboards.values() for event in json.loads(body).get('events', [])]
+    if not events:
+        raise SystemExit(f"{archive_path} 中没有录制赛程")
+    slate = []
+    for i in range(games):
+        event = copy.deepcopy(events[i % len(events)])
+        event['id'] = f"{event['id']}-{i}" if i >= len(events) else event['id']
+        slate.append(event)
+    return slate
+
+
+def _measure_allocations(build):
+    """运行 build，返回 (结果, 保留字节数, 峰值字节数, 新分配的内存块数, 耗时微秒)；
+    耗时在 tracemalloc 开启时测得，只用于相对比较"""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    base, _ = tracemalloc.get_traced_memory()
+    t0 = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return result, current - base, peak - base, blocks, elapsed * 1e6
+
+
+def models_bench(archive_path, games=15):
+    """比较一整晚 games 场比赛两种表示的内存：旧代码每次重跑都重新生成节次字典，
+    新代码每份赛程只构建一次 Game，重跑时直接读取"""
+    from models import build_game
+
+    events = slate_events(archive_path, games)
+    strategies = {
+        'legacy_period_dicts': lambda: [game_period_info_legacy(event) for event in events],
+        'slotted_models': lambda: [build_game(event) for event in events],
+    }
+    report = {'games': len(events)}
+    for strategy, build in strategies.items():
+        build()  # 预热（导入、时区缓存等）
+        _, retained, peak, blocks, micros = _measure_allocations(build)
+        report[strategy] = {
+            'retained_kb': round(retained / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'allocated_blocks': blocks,
+            'build_us': round(micros),
+        }
+    report['legacy_period_dicts']['built'] = 'every rerun'
+    report['slotted_models']['built'] = 'once per scoreboard payload'
+    return report
+
+
+# ====== 启动耗时 ======
+STARTUP_MODULES = (
+    'streamlit', 'pandas', 'pytz', 'requests', 'espn_client', 'game_store',
+    'live_stream', 'metrics', 'models', 'cards', 'time_utils', 'player_names', 'box_score',
+    'polling', 'summary_fetch', 'translations',
+)
+
+
+def import_times(modules=STARTUP_MODULES, repeat=3):
+    """每个模块在全新解释器中的累计导入耗时（毫秒，含依赖，取 repeat 次中的最小值）"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in modules:
+        samples = []
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                cwd=here, capture_output=True, text=True,
+            )
+            # -X importtime 每行为 "import time: 自身 | 累计 | 模块"，顶层模块在最后
+            for line in reversed(proc.stderr.splitlines()):
+                parts = line.split('|')
+                if len(parts) == 3 and parts[2].strip() == module:
+                    samples.append(int(parts[1]) / 1000)
+                    break
+        if samples:
+            results[module] = round(min(samples), 1)
+    return dict(sorted(results.items(), key=lambda item: item[1], reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ESPN 数据录制与回放')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='录制一整晚的 ESPN 数据')
+    record_parser.add_argument('--dates', required=True, help='ESPN 日期，格式 YYYYMMDD')
+    record_parser.add_argument('--out', required=True)
+    record_parser.add_argument('--interval', type=float, default=10)
+    record_parser.add_argument('--duration', type=float, default=6 * 3600)
+
+    serve_parser = commands.add_parser('serve', help='按模拟时钟回放归档')
+    serve_parser.add_argument('--archive', required=True)
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8600)
+    serve_parser.add_argument('--speed', type=float, default=1.0)
+    serve_parser.add_argument('--offset', type=float, default=0.0)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help='每个请求注入的延迟（秒）')
+
+    bench_parser = commands.add_parser('bench', help='用回放数据压测页面')
+    bench_parser.add_argument('--archive', required=True)
+    bench_parser.add_argument('--sessions', type=int, default=10)
+    bench_parser.add_argument('--reruns', type=int, default=5)
+    bench_parser.add_argument('--speed', type=float, default=60.0)
+    bench_parser.add_argument('--offset', type=float, default=0.0)
+    bench_parser.add_argument('--app', help='被测的 app.py，默认为本目录下的')
+
+    fanout_parser = commands.add_parser('fanout', help='对比旧线程池与异步获取引擎的并发拉取耗时')
+    fanout_parser.add_argument('--archive', required=True)
+    fanout_parser.add_argument('--games', type=int, default=15)
+    fanout_parser.add_argument('--latency', type=float, default=0.8, help='每个请求注入的延迟（秒）')
+    fanout_parser.add_argument('--rounds', type=int, default=3)
+
+    translate_parser = commands.add_parser('translate', help='对比旧译名查找与预编译索引的耗时')
+    translate_parser.add_argument('--archive', required=True)
+    translate_parser.add_argument('--repeat', type=int, default=200)
+
+    parse_parser = commands.add_parser('parse', help='对比旧的逐行解析与列式解析的耗时')
+    parse_parser.add_argument('--archive', required=True)
+    parse_parser.add_argument('--repeat', type=int, default=20)
+
+    decode_parser = commands.add_parser('decode', help='对比各 JSON 解码后端的耗时')
+    decode_parser.add_argument('--archive', required=True)
+    decode_parser.add_argument('--repeat', type=int, default=50)
+
+    models_parser = commands.add_parser('models', help='对比节次字典与 __slots__ 比赛模型的内存')
+    models_parser.add_argument('--archive', required=True)
+    models_parser.add_argument('--games', type=int, default=15)
+
+    startup_parser = commands.add_parser('startup', help='统计各模块的导入耗时')
+    startup_parser.add_argument('--repeat', type=int, default=3)
+
+    compile_parser = commands.add_parser('compile-translations', help='预编译球员译名快照，用于构建镜像')
+    compile_parser.add_argument('--out', help='快照路径；页面运行时需用 NBA_TRANSLATIONS_INDEX 指向同一路径')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.dates, args.out, args.interval, args.duration)
+    elif args.command == 'serve':
+        server, _ = start_replay_server(args.archive, args.host, args.port, args.speed, args.offset, args.latency)
+        print(f"回放服务已启动: http://{args.host}:{server.server_address[1]}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.command == 'fanout':
+        report = fanout(args.archive, args.games, args.latency, args.rounds)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.command == 'translate':
+        print(json.dumps(translate_bench(args.archive, args.repeat), ensure_ascii=False, indent=2))
+    elif args.command == 'parse':
+        print(json.dumps(parse_bench(args.archive, args.repeat), ensure_ascii=False, indent=2))
+    elif args.command == 'decode':
+        print(json.dumps(decode_bench(args.archive, args.repeat), ensure_ascii=False, indent=2))
+    elif args.command == 'models':
+        print(json.dumps(models_bench(args.archive, args.games), ensure_ascii=False, indent=2))
+    elif args.command == 'compile-translations':
+        from player_names import compile_translations
+        path, entries = compile_translations(args.out)
+        print(f"已写入 {path}（{entries} 条）")
+    elif args.command == 'startup':
+        print(json.dumps(import_times(repeat=args.repeat), ensure_ascii=False, indent=2))
+    else:
+        report = bench(args.archive, args.sessions, args.reruns, args.speed, args.offset, app_path=args.app)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
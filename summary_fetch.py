@@ -0,0 +1,92 @@
+"""球员数据（summary）的下载和异步并发获取引擎
+
+一次性发出全部请求，全局并发由调用方传入的共享线程池限制，单场和整批各有截止时间，
+超过整批截止时间返回已完成的部分结果。页面和 replay.py fanout 压测共用这里的实现。
+"""
+import asyncio
+
+import espn_client
+import game_store
+
+FETCH_CONCURRENCY = espn_client.POOL_SIZE  # 全局并发上限，与连接池大小一致
+SUMMARY_REQUEST_DEADLINE = 3.5  # 单场请求截止时间（秒）
+SUMMARY_BATCH_DEADLINE = 5  # 整批请求截止时间（秒），超时返回已完成的部分结果
+# 截止时间只决定调用方等多久，取消不了已在线程中阻塞的请求，所以请求本身也要有界：
+# 连接超时与读取超时（两次收到数据之间的最长等待）之和不超过单场截止时间，且不重试（下一轮轮询会再拉），
+# ESPN 变慢时工作线程不会被一场请求占用数倍于截止时间，赛程轮询仍有线程可用
+SUMMARY_HTTP_TIMEOUT = (1, SUMMARY_REQUEST_DEADLINE - 1)  # (连接, 读取) 超时（秒）
+
+
+def slim_summary(data):
+    """只保留 summary 中的 boxscore.players 主数据（球队名、数据标签、球员名和数据）及比赛状态"""
+    teams = []
+    for team_data in data.get('boxscore', {}).get('players', []):
+        statistics = []
+        for stat in team_data.get('statistics', []):
+            labels = stat.get('labels', [])
+            if stat.get('athletes') and ('PTS' in labels or '得分' in labels):
+                athletes = []
+                for ath in stat['athletes']:
+                    athlete_data = ath.get('athlete', {})
+                    name = (athlete_data.get('displayName') or athlete_data.get('fullName') or
+                            athlete_data.get('shortName') or ath.get('displayName') or ath.get('name') or '')
+                    athletes.append({'athlete': {'displayName': name}, 'stats': ath.get('stats', [])})
+                statistics.append({'labels': labels, 'athletes': athletes})
+                break
+        teams.append({
+            'team': {'displayName': team_data.get('team', {}).get('displayName', '')},
+            'statistics': statistics
+        })
+    try:
+        competition = data.get('header', {}).get('competitions', [{}])[0]
+        state = competition.get('status', {}).get('type', {}).get('state')
+    except Exception:
+        state = None
+    return {'state': state, 'boxscore': {'players': teams}}
+
+
+def is_final_summary(data):
+    """比赛已结束的 summary 数据不会再变化，可永久固定"""
+    return data.get('state') == 'post'
+
+
+def download_summary(event_id):
+    """下载单场比赛裁剪后的 summary（附带内容标记）；已结束的比赛先读、后写本地存储"""
+    store = game_store.get_store()
+    if store is not None:
+        data = store.get_summary(event_id)
+        if data is not None:
+            return data
+    data, marker = espn_client.get_json('summary', params={'event': event_id}, timeout=SUMMARY_HTTP_TIMEOUT,
+                                        pin_if=is_final_summary, with_marker=True,
+                                        transform=slim_summary, retry=False)
+    if not (data.get('boxscore') and data.get('boxscore').get('players')):
+        raise ValueError(f"summary {event_id} 缺少球员数据")
+    # 附带内容标记，解析缓存据此判断数据是否变化
+    data = dict(data, _marker=marker)
+    if store is not None and is_final_summary(data):
+        store.put_summary(event_id, data)
+    return data
+
+
+async def _gather(fetch, calls, executor, request_deadline, batch_deadline):
+    loop = asyncio.get_running_loop()
+    # 一次性发出全部请求，不再分批等待
+    tasks = [
+        asyncio.ensure_future(asyncio.wait_for(loop.run_in_executor(executor, fetch, *args), request_deadline))
+        for args in calls
+    ]
+    done, pending = await asyncio.wait(tasks, timeout=batch_deadline)
+    for task in pending:
+        task.cancel()
+    return [task.result() for task in done if not task.cancelled() and task.exception() is None]
+
+
+def gather_in_executor(fetch, calls, executor, request_deadline=SUMMARY_REQUEST_DEADLINE,
+                       batch_deadline=SUMMARY_BATCH_DEADLINE):
+    """在共享线程池中并发执行 fetch(*args)（calls 为参数元组序列），
+    返回截止时间内成功完成的结果（顺序不定）；超时或出错的调用被丢弃。
+    截止时间到期只是不再等待，线程中的 fetch 仍会运行到结束，fetch 自身需要有界（见 SUMMARY_HTTP_TIMEOUT）"""
+    if not calls:
+        return []
+    return asyncio.run(_gather(fetch, calls, executor, request_deadline, batch_deadline))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 仓库根目录下的模块（espn_client、time_utils 等）按顶层模块导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+"""列式球员数据解析和表格格式化"""
+from box_score import BOX_SCORE_COLUMNS, format_box_score, parse_player_stats
+
+LABELS = ['MIN', 'FG', '3PT', 'FT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TO', 'PF', '+/-', 'PTS']
+
+
+def team(*athletes):
+    return {'statistics': [{'labels': LABELS, 'athletes': [
+        {'athlete': {'displayName': name}, 'stats': stats} for name, stats in athletes
+    ]}]}
+
+
+HOME = team(
+    ('LeBron James', ['36', '10-20', '2-5', '5/6', '1', '7', '8', '9', '1', '0', '3', '2', '+5', '27']),
+    ('Bench Guy', ['0', '0-0', '0-0', '0-0', '0', '0', '0', '0', '0', '0', '0', '0', '0', '0']),
+    ('DNP', ['--'] * len(LABELS)),
+)
+AWAY = team(
+    ('Stephen Curry', ['34:30', '11-22', '6-12', '4-4', '0', '5', '5', '6', '2', '0', '4', '1', '-5', '32']),
+    ('Short Stats', ['12', '1-3']),
+)
+
+
+def test_parse_columns_are_typed_and_filtered():
+    away, home = parse_player_stats({'boxscore': {'players': [HOME, AWAY]}})
+    assert list(home.columns) == BOX_SCORE_COLUMNS
+    assert home['name'].tolist() == ['LeBron James']  # 未上场和 DNP 的球员被过滤
+    assert all(str(home[col].dtype) == 'int64' for col in BOX_SCORE_COLUMNS[1:])
+    row = home.iloc[0]
+    assert (row['min_seconds'], row['pts'], row['fgm'], row['fga'], row['ftm'], row['fta']) == (2160, 27, 10, 20, 5, 6)
+    assert away['name'].tolist() == ['Stephen Curry', 'Short Stats']
+    assert away.iloc[0]['min_seconds'] == 34 * 60 + 30
+    assert away.iloc[1]['pts'] == 0  # 数据不全时缺失的列记 0
+
+
+def test_parse_without_players_returns_empty_frames():
+    for data in (None, {}, {'boxscore': {'players': [HOME]}}):
+        away, home = parse_player_stats(data)
+        assert away.empty and home.empty
+        assert list(away.columns) == BOX_SCORE_COLUMNS
+
+
+def test_format_box_score():
+    away, _ = parse_player_stats({'boxscore': {'players': [HOME, AWAY]}})
+    full = format_box_score(away, str.upper)
+    assert full.iloc[0].tolist() == ['STEPHEN CURRY', '34:30', 32, '11/22', '6/12', '4/4', 5, 6, 4]
+    simple = format_box_score(away, str, full=False)
+    assert list(simple.columns) == ['球员', '时间', '得分']
+    assert simple['时间'].tolist() == ['34:30', '12:00']
@@ -0,0 +1,88 @@
+"""共享连接池会话：对本地替身服务连续请求时复用同一条 keep-alive 连接；不重试的请求共用同一连接池"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import espn_client
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 支持 keep-alive
+
+    hits = {}
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rsplit('/', 1)[-1]
+        StandInHandler.hits[path] = StandInHandler.hits.get(path, 0) + 1
+        if path == 'slow':
+            time.sleep(1)
+        body = b'{"events": []}'
+        if path == 'unavailable':
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StandInHandler.hits = {}
+    monkeypatch.setattr(espn_client, 'ESPN_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    pool_size, retry_total = espn_client.POOL_SIZE, espn_client.RETRY_TOTAL
+    espn_client.configure(pool_size=4, retry_total=0)
+    yield server
+    server.shutdown()
+    espn_client.configure(pool_size=pool_size, retry_total=retry_total)
+
+
+def test_sequential_requests_reuse_one_connection(stand_in):
+    for _ in range(10):
+        assert espn_client.get('scoreboard', params={'dates': '20260116'}).status_code == 200
+
+    stats = espn_client.pool_stats()
+    assert stats['requests'] == 10
+    assert stats['errors'] == 0
+    assert stats['connections_created'] == 1
+    assert stats['connections_reused'] == 9
+
+
+def test_get_json_decodes_through_the_pool(stand_in):
+    assert espn_client.get_json('scoreboard', params={'dates': '20260116'}) == {'events': []}
+    assert espn_client.get_json('scoreboard', params={'dates': '20260117'}) == {'events': []}
+    assert espn_client.pool_stats()['connections_reused'] >= 1
+
+
+def test_no_retry_requests_fail_once_and_share_the_pool(stand_in):
+    espn_client.configure(retry_total=2, backoff_factor=0)
+    assert espn_client.get('unavailable').status_code == 503
+    assert StandInHandler.hits['unavailable'] == 3  # 默认会话重试两次
+
+    StandInHandler.hits.clear()
+    assert espn_client.get('unavailable', retry=False).status_code == 503
+    assert StandInHandler.hits['unavailable'] == 1
+    espn_client.get('scoreboard', retry=False)
+    assert espn_client.pool_stats()['connections_created'] == 1
+
+
+def test_no_retry_request_is_bounded_by_its_timeout(stand_in):
+    import requests
+
+    espn_client.configure(retry_total=2, backoff_factor=0)
+    started = time.perf_counter()
+    with pytest.raises(requests.ReadTimeout):
+        espn_client.get('slow', timeout=0.2, retry=False)
+    assert time.perf_counter() - started < 0.9
+    assert StandInHandler.hits['slow'] == 1
@@ -0,0 +1,68 @@
+"""球员译名索引：规范化写法、自动生成的后缀译名、未收录的球员，以及预编译快照"""
+import marshal
+
+import pytest
+
+import player_names
+from player_names import build_player_index, lookup_player_name
+
+PLAYER_TRANSLATION = {
+    'Luka Doncic': '东契奇',
+    'Jaren Jackson': '小贾伦·杰克逊的父亲',
+    'Jaren Jackson Jr.': '小贾伦·杰克逊',
+    'Gary Trent': '加里·特伦特',
+}
+
+
+@pytest.fixture(scope='module')
+def index():
+    return build_player_index(PLAYER_TRANSLATION)
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Luka Doncic', '东契奇'),
+    ('Luka Dončić', '东契奇'),  # 重音
+    ('luka doncic', '东契奇'),  # 大小写
+    ('  Luka   Doncic ', '东契奇'),  # 多余空白
+    ('Gary Trent Jr.', '加里·特伦特小'),  # 自动生成的后缀译名
+    ('Gary Trent Jr', '加里·特伦特小'),
+    ('Gary Trent II', '加里·特伦特二世'),
+])
+def test_lookup_variants(index, name, expected):
+    assert lookup_player_name(index, name) == expected
+
+
+def test_table_entry_beats_generated_suffix(index):
+    assert lookup_player_name(index, 'Jaren Jackson Jr.') == '小贾伦·杰克逊'
+    assert lookup_player_name(index, 'jaren jackson jr') == '小贾伦·杰克逊'
+
+
+def test_unknown_player_returns_none(index):
+    assert lookup_player_name(index, 'Nobody Unknown') is None
+
+
+def test_compiled_snapshot_is_loaded_without_rebuilding(tmp_path, monkeypatch):
+    path = str(tmp_path / 'index.marshal')
+    monkeypatch.setattr(player_names, 'TRANSLATIONS_INDEX_PATH', path)
+    _, entries = player_names.compile_translations()
+    monkeypatch.setattr(player_names, 'build_player_index', lambda table: pytest.fail('snapshot was rebuilt'))
+    team_translation, player_index = player_names.load_compiled_translations()
+    assert len(player_index) == entries
+    assert team_translation['Boston Celtics'] == '凯尔特人'
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path, monkeypatch):
+    path = tmp_path / 'index.marshal'
+    path.write_bytes(marshal.dumps((('stale', ()), {}, {'Someone': '某人'})))
+    monkeypatch.setattr(player_names, 'TRANSLATIONS_INDEX_PATH', str(path))
+    _, player_index = player_names.load_compiled_translations()
+    assert 'Someone' not in player_index
+    assert marshal.loads(path.read_bytes())[0] == player_names.translations_key()
+
+
+def test_unwritable_snapshot_path_falls_back_to_memory(tmp_path, monkeypatch):
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    monkeypatch.setattr(player_names, 'TRANSLATIONS_INDEX_PATH', str(blocker / 'index.marshal'))
+    _, player_index = player_names.load_compiled_translations()
+    assert player_index
@@ -0,0 +1,71 @@
+"""自适应轮询间隔，以及未开始比赛的卡片刷新间隔（开赛前数小时）"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import build_game
+from polling import (CARD_MAX_INTERVAL, IDLE_POLL_INTERVAL, PRE_POLL_INTERVAL, PRE_TIPOFF_LEAD,
+                     card_interval_outdated, card_refresh_interval, game_phase, game_poll_delay,
+                     next_poll_delay)
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def make_game(state='pre', tip_off=NOW + timedelta(hours=6), period=0, clock='0:00', event_id='1'):
+    competitor = {'team': {'displayName': 'Team', 'logo': ''}, 'score': '0', 'linescores': []}
+    return build_game({
+        'id': event_id,
+        'date': tip_off.strftime('%Y-%m-%dT%H:%MZ'),
+        'status': {'type': {'state': state, 'description': ''}},
+        'competitions': [{'status': {'period': period, 'displayClock': clock},
+                          'competitors': [competitor, dict(competitor)]}],
+    })
+
+
+def test_pre_game_hours_away_waits_until_tip_off_lead():
+    game = make_game()
+    assert game_poll_delay(game, NOW) == 6 * 3600 - PRE_TIPOFF_LEAD
+
+
+def test_pre_game_card_interval_is_capped():
+    game = make_game()
+    assert card_refresh_interval(game, True, 5, NOW) == CARD_MAX_INTERVAL
+    assert card_refresh_interval(game, False, 5, NOW) is None
+
+
+def test_pre_game_card_requests_app_rerun_near_tip_off():
+    game = make_game(tip_off=NOW + timedelta(minutes=10))
+    run_every = card_refresh_interval(game, True, 5, NOW)
+    assert run_every == 10 * 60 - PRE_TIPOFF_LEAD
+    # 间隔刚确定时不需要整页重跑
+    assert not card_interval_outdated(game, run_every, NOW)
+    # fragment 在开赛前 PRE_TIPOFF_LEAD 秒重跑，比赛仍未开始：间隔已过时，需要整页重跑改成密集刷新
+    fired_at = NOW + timedelta(seconds=run_every)
+    assert card_interval_outdated(game, run_every, fired_at)
+    rerun_every = card_refresh_interval(game, True, 5, fired_at)
+    assert rerun_every == PRE_POLL_INTERVAL
+    assert not card_interval_outdated(game, rerun_every, fired_at + timedelta(hours=1))
+
+
+def test_capped_card_far_from_tip_off_is_not_outdated():
+    game = make_game(tip_off=NOW + timedelta(hours=6))
+    assert not card_interval_outdated(game, CARD_MAX_INTERVAL, NOW + timedelta(seconds=CARD_MAX_INTERVAL))
+
+
+@pytest.mark.parametrize('state, period, clock, phase', [
+    ('in', 4, '2:00', 'crunch'),
+    ('in', 2, '5:00', 'live'),
+    ('in', 2, '0:00', 'halftime'),
+    ('in', 3, '0:00', 'break'),
+    ('post', 4, '0:00', 'post'),
+])
+def test_game_phase(state, period, clock, phase):
+    assert game_phase(make_game(state, period=period, clock=clock)) == phase
+
+
+def test_next_poll_delay():
+    assert next_poll_delay([], NOW) == IDLE_POLL_INTERVAL
+    assert next_poll_delay([make_game('post', period=4)], NOW) == IDLE_POLL_INTERVAL
+    live = make_game('in', period=2, clock='5:00', event_id='2')
+    assert next_poll_delay([make_game(), live], NOW) == game_poll_delay(live, NOW)
+    assert card_interval_outdated(live, 5, NOW) is False
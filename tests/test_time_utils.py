@@ -0,0 +1,45 @@
+"""北京日期与 ESPN 赛程日期的映射，以及开赛时间转换（覆盖美东夏令时切换日）"""
+import pytest
+
+from time_utils import ESPN_TZ, beijing_date_of, espn_date_keys, parse_espn_time, to_beijing
+
+
+@pytest.mark.parametrize('date_str, expected', [
+    # 2026-03-08 美东进入夏令时（EST -> EDT）
+    ('2026-03-08', ('20260307', '20260308')),
+    ('2026-03-09', ('20260308', '20260309')),
+    # 2026-11-01 美东退出夏令时（EDT -> EST）
+    ('2026-11-01', ('20261031', '20261101')),
+    ('2026-11-02', ('20261101', '20261102')),
+    ('2026-01-16', ('20260115', '20260116')),
+])
+def test_espn_date_keys(date_str, expected):
+    assert espn_date_keys(date_str) == expected
+
+
+@pytest.mark.parametrize('espn_time, beijing', [
+    # 夏令时开始前后：美东晚上 7 点半开赛
+    ('2026-03-08T00:30Z', '2026-03-08 08:30'),  # 3 月 7 日 19:30 EST
+    ('2026-03-08T23:30Z', '2026-03-09 07:30'),  # 3 月 8 日 19:30 EDT
+    # 夏令时结束前后
+    ('2026-11-01T23:30Z', '2026-11-02 07:30'),  # 11 月 1 日 18:30 EST
+    ('2026-11-01T03:30Z', '2026-11-01 11:30'),  # 10 月 31 日 23:30 EDT
+])
+def test_tip_off_conversion(espn_time, beijing):
+    assert to_beijing(parse_espn_time(espn_time)).strftime('%Y-%m-%d %H:%M') == beijing
+    assert beijing_date_of(espn_time) == beijing[:10]
+
+
+@pytest.mark.parametrize('date_str', ['2026-03-08', '2026-03-09', '2026-11-01', '2026-11-02'])
+def test_beijing_day_games_come_from_its_espn_dates(date_str):
+    """北京当天开赛的比赛一定落在该日期对应的两个 ESPN 日期之一"""
+    keys = espn_date_keys(date_str)
+    for hour in range(24):
+        espn_time = f"{date_str}T{hour:02d}:00+08:00"
+        assert parse_espn_time(espn_time).astimezone(ESPN_TZ).strftime('%Y%m%d') in keys
+
+
+def test_unparseable_times():
+    assert parse_espn_time(None) is None
+    assert parse_espn_time('TBD') is None
+    assert beijing_date_of(None) is None
@@ -0,0 +1,46 @@
+"""时间工具：时区对象只创建一次，北京日期到 ESPN 赛程日期的映射做缓存
+
+ESPN 赛程按美国东部时间划分日期，东部时间有夏令时，转换时一律通过时区对象，
+不使用固定时差。
+"""
+import functools
+from datetime import datetime, timedelta
+
+import pytz
+
+BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+ESPN_TZ = pytz.timezone('America/New_York')
+
+
+def now_beijing():
+    return datetime.now(BEIJING_TZ)
+
+
+@functools.lru_cache(maxsize=128)
+def espn_date_keys(date_str):
+    """与北京时间某天重叠的两个 ESPN 赛程日期（北京当天 0 点和 24 点所在的美东日期）"""
+    beijing_start = BEIJING_TZ.localize(datetime.strptime(date_str, '%Y-%m-%d'))
+    beijing_end = BEIJING_TZ.normalize(beijing_start + timedelta(days=1) - timedelta(seconds=1))
+    first = beijing_start.astimezone(ESPN_TZ).strftime('%Y%m%d')
+    last = beijing_end.astimezone(ESPN_TZ).strftime('%Y%m%d')
+    return (first, last) if first != last else (first,)
+
+
+def parse_espn_time(date_str):
+    """ESPN 的 ISO 时间（如 '2026-01-16T00:30Z'）转成带时区的 datetime，无法解析时为 None"""
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def to_beijing(dt):
+    """带时区的时间转成北京时间，None 原样返回"""
+    return dt.astimezone(BEIJING_TZ) if dt is not None else None
+
+
+@functools.lru_cache(maxsize=2048)
+def beijing_date_of(date_str):
+    """ESPN 开赛时间所在的北京时间日期 'YYYY-MM-DD'，无法解析时为 None"""
+    dt = to_beijing(parse_espn_time(date_str))
+    return dt.strftime('%Y-%m-%d') if dt is not None else None